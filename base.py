@@ -46,15 +46,16 @@
 
 import os
 import re
-import shlex
 import shutil
 import sys
+from collections.abc import Callable
 
-# Ruff import ordering is authoritative here; no blank line after __main__
-import __main__
 import mtc_utils
 from tablet_kbd import special_consoles_config
 from tmux_conf import TmuxConfig
+from tmux_conf.features import FEATURES
+from tmux_conf.probes import Probes, blocking
+from tmux_conf.tokenizer import tokenize
 
 # https://youtu.be/yFLY0SVutgM?si=VoKETDw39BAUHfST&t=420
 # class Environment(StrEnum):
@@ -91,8 +92,9 @@ class BaseConfig(TmuxConfig):
 
     #
     #  This causes most colors on MacOS Term.app to fail
+    #  If None, it is used unless TERM_PROGRAM is Apple_Terminal
     #
-    use_24bit_color: bool = os.getenv("TERM_PROGRAM") != "Apple_Terminal"
+    use_24bit_color: bool | None = None
     #
     #  Tc is more commonly supported by terminals
     #  RGB may provide more accurate color representation
@@ -110,11 +112,13 @@ class BaseConfig(TmuxConfig):
     #
     #  Default templates for the status bar, so that they can easily be
     #  modified using status_bar_customization()
+    #  HOSTNAME_VALUE is replaced by mtc_utils.HOSTNAME, so that the hostname
+    #  is not looked up when this is imported.
     #
     sb_left: str = "|#{session_name}| "
     sb_right: str = "%a %h-%d %H:%MUSERNAME_TEMPLATEHOSTNAME_TEMPLATE"
     username_template: str = " #[fg=colour1,bg=colour195]#(whoami)#[default]"
-    hostname_template: str = f"#[fg=colour195,bg=colour1]{mtc_utils.HOSTNAME}#[default]"
+    hostname_template: str = "#[fg=colour195,bg=colour1]HOSTNAME_VALUE#[default]"
     tpm_initializing: str = "#[reverse,blink] tpm initializing...#[default]"
 
     handle_iterm2: bool = True  # Select screen-256color for iTerm2
@@ -124,8 +128,9 @@ class BaseConfig(TmuxConfig):
     #  Indicates this is a separate tmux env, I use it for testing
     #  plugin compatibility, and changed settings in a way that does not
     #  interfere with my main environment
+    #  If None, it is taken from T2_ENV
     #
-    t2_env: str = os.getenv("T2_ENV", "")
+    t2_env: str | None = None
     prefix_key_T2: str = "C-b"  # prefix for inner dev environment
 
     # Disables tmux default popup menus, instead relying on the plugin
@@ -171,6 +176,27 @@ class BaseConfig(TmuxConfig):
 
     # use_debug_log = True  # if True, debug log will be printed
 
+    #
+    #  Env variables read by this class and mtc_utils
+    #
+    fingerprint_env = TmuxConfig.fingerprint_env + (
+        "HOSTNAME_SHORT",
+        "LC_CONSOLE",
+        "LC_KEYBOARD",
+        "LC_ORIGIN",
+        "LC_TERMINAL",
+        "SHELL",
+        "SSH_CLIENT",
+        "T2_ENV",
+        "TERM",
+        "TERM_PROGRAM",
+        "TERMUX_VERSION",
+        "TMUX_NO_CLIPBOARD",
+        "TMUX_OUTER",
+        "USER",
+    )
+    fingerprint_env_presence = ("SHLVL",)
+
     # pylint: disable=too-many-positional-arguments,too-many-arguments
     def __init__(
         self,
@@ -184,6 +210,11 @@ class BaseConfig(TmuxConfig):
         replace_config: bool = False,  # replace config with no prompt
         clear_plugins: bool = False,  # remove all current plugins
         plugins_display: int = 0,  # Display info about plugins
+        force_regenerate: bool = False,  # ignore matching fingerprint
+        timings: str = "",  # report time per phase, "table" or "json"
+        env_dump: str = "",  # save environment snapshot here, then terminate
+        env_load: str = "",  # generate from this environment snapshot
+        output: str = "",  # write here, conf_file is then where it will be used
         # environment: Environment = Environment.normal,
     ) -> None:
         # print(f"><> BaseConfig.__init__() - conf_file [{conf_file}]")
@@ -197,7 +228,17 @@ class BaseConfig(TmuxConfig):
             replace_config=replace_config,
             clear_plugins=clear_plugins,
             plugins_display=plugins_display,
+            force_regenerate=force_regenerate,
+            timings=timings,
+            env_dump=env_dump,
+            env_load=env_load,
+            output=output,
         )
+        #  Resolved here, so that a loaded environment snapshot is used
+        if self.use_24bit_color is None:
+            self.use_24bit_color = os.getenv("TERM_PROGRAM") != "Apple_Terminal"
+        if self.t2_env is None:
+            self.t2_env = os.getenv("T2_ENV", "")
         self.tablet_keyb = None
         self.hook_array_index = 0  # used to group hooks
         # Will be unbound when only one pane in current window, in order
@@ -247,6 +288,38 @@ class BaseConfig(TmuxConfig):
     def edit_config(self, edit_key: str = "e") -> None:
         pass  # Im not really using it, so skip it
 
+    def fingerprint_files(self) -> list[str]:
+        files = super().fingerprint_files()
+        files.append(mtc_utils.__file__)
+        consoles_file = sys.modules[special_consoles_config.__module__].__file__
+        if consoles_file:
+            files.append(consoles_file)
+        #  alternate_key_euro() depends on the cached currency
+        files.append(str(mtc_utils.currency_cache_file()))
+        return files
+
+    def declare_probes(self) -> Probes:
+        probes = super().declare_probes()
+        #  Might run a custom hostname binary
+        probes["hostname_short"] = blocking(lambda: mtc_utils.HOSTNAME)
+        probes["currency"] = mtc_utils.cached_currency
+        probes["is_darwin"] = lambda: mtc_utils.IS_DARWIN
+        probes["is_ish"] = lambda: mtc_utils.IS_ISH
+        for tool in ("lazygit", "yazi"):
+            probes[tool] = self.which_probe(tool)
+        return probes
+
+    @staticmethod
+    def which_probe(tool: str) -> Callable[[], str]:
+        return lambda: shutil.which(tool) or ""
+
+    def pre_plugin_checks(self) -> None:
+        super().pre_plugin_checks()
+        #  If an environment snapshot was loaded, its values must be used
+        mtc_utils.HOSTNAME = self.probes["hostname_short"]
+        mtc_utils.IS_DARWIN = self.probes["is_darwin"]
+        mtc_utils.IS_ISH = self.probes["is_ish"]
+
     def assign_style(self, style_name) -> None:
         """Use this to name the style being used, and to ensure that
         multiple styles are not unintentionally assigned.
@@ -303,7 +376,8 @@ class BaseConfig(TmuxConfig):
         available via prefix, in order to still be accessible on dumb
         terminals.
         """
-        self.tablet_keyb = special_consoles_config(self)
+        with self.timings.phase("special_consoles_config"):
+            self.tablet_keyb = special_consoles_config(self)
         if mtc_utils.IS_INNER_TMUX:
             self.write("""#
             #  This is configured as an INNER tmux, remapping some key binds
@@ -311,19 +385,22 @@ class BaseConfig(TmuxConfig):
             #
             """)
 
-        self.remove_unwanted_default_bindings()
-        self.check_all_muc_keys_are_defined()
-        self.connecting_terminal()
-        self.general_environment()
-        self.session_handling()
-        self.windows_handling()
-        self.pane_handling()
-        self.handle_buffers()
-        self.mouse_handling()
-        self.handle_hooks()
-        self.status_bar()
-
-        self.__base_overrides()
+        for section in (
+            self.remove_unwanted_default_bindings,
+            self.check_all_muc_keys_are_defined,
+            self.connecting_terminal,
+            self.general_environment,
+            self.session_handling,
+            self.windows_handling,
+            self.pane_handling,
+            self.handle_buffers,
+            self.mouse_handling,
+            self.handle_hooks,
+            self.status_bar,
+            self.__base_overrides,
+        ):
+            with self.timings.phase(section.__name__):
+                section()
 
     def __base_overrides(self) -> None:
         """This should be at the very end of content subclasses
@@ -423,7 +500,7 @@ class BaseConfig(TmuxConfig):
         #     set -as terminal-overrides ',*:Ss=\\E[%p1%d q:Se=\\E[2 q'
         #       """
         #     )
-        if self.vers_ok(2.9):
+        if self.has("tmux_256color"):
             w(f"{self.opt_server} default-terminal tmux-256color")
         elif self.vers_ok(1.0):
             if self.handle_iterm2 and os.getenv("LC_TERMINAL") == "iTerm2":
@@ -450,7 +527,7 @@ class BaseConfig(TmuxConfig):
             #  through to applications running inside tmux.
             w(f"{self.opt_server} focus-events on")
 
-        if self.vers_ok(3.2):
+        if self.has("extended_keys"):
             w(f"{self.opt_server} extended-keys on")
 
         #
@@ -553,11 +630,11 @@ class BaseConfig(TmuxConfig):
                     f"tmux {self.vers.get()}"
                     ' - #{session_name}:#{window_name}:#T"'
                 )
-            if self.vers_ok(3.5):
+            if self.has("allow_set_title"):
                 w(f"{self.opt_server} allow-set-title on")
         else:
             w(f"{self.opt_server} set-titles off")
-            if self.vers_ok(3.5):
+            if self.has("allow_set_title"):
                 w(f"{self.opt_server} allow-set-title off")
 
         if self.vers_ok(3.3):
@@ -674,9 +751,8 @@ class BaseConfig(TmuxConfig):
         """
 
         min_vers_display_message = 1.0
-        min_vers_popup = 3.2
-        min_vers_popup_style = 3.3
-        min_vers_floating_pane = 3.7
+        min_vers_popup = FEATURES["popup"]
+        min_vers_floating_pane = FEATURES["floating_pane"]
         used_any_popups = False
         w = self.write
 
@@ -690,19 +766,19 @@ class BaseConfig(TmuxConfig):
         #""")
 
         if key_floating_pane:
-            if self.vers_ok(min_vers_floating_pane):
+            if self.has("floating_pane"):
                 # create a floating pane, only reshapable by mouse: new-pane
                 w(
                     f"bind -N 'New Floating Pane'  {key_floating_pane}  new-pane -c "
                     "'#{pane_current_path}'"
                 )
-            elif self.vers_ok(min_vers_popup):
+            elif self.has("popup"):
                 w(
                     "# Using a display-popup as fallback for Floating Panes on "
                     f"tmux < {min_vers_floating_pane}"
                 )
                 dp = "display-popup -w 70% -h 70% -E"
-                if self.vers_ok(min_vers_popup_style):
+                if self.has("popup_title"):
                     dp += ' -T "#[align=centre] PopUp Scratchpad Session " '
                 w(
                     f'bind -N "PopUp scratchpad session"  {key_floating_pane}  '
@@ -717,10 +793,10 @@ class BaseConfig(TmuxConfig):
                 )
 
         if key_lazygit:
-            if shutil.which("lazygit"):
-                if self.vers_ok(min_vers_popup):
+            if self.probes["lazygit"]:
+                if self.has("popup"):
                     dp = "display-popup -d '#{pane_current_path}' -w 80% -h 80% -E"
-                    if self.vers_ok(min_vers_popup_style):
+                    if self.has("popup_title"):
                         dp += ' -T "#[align=centre] LazyGit " '
                     w(f'bind -N "PopUp lazygit"      {key_lazygit}  {dp} lazygit')
                     used_any_popups = True
@@ -736,10 +812,10 @@ class BaseConfig(TmuxConfig):
                 )
 
         if key_yazi:
-            if shutil.which("yazi"):
-                if self.vers_ok(min_vers_popup):
+            if self.probes["yazi"]:
+                if self.has("popup"):
                     dp = "display-popup -d '#{pane_current_path}' -w 90% -h 90% -E"
-                    if self.vers_ok(min_vers_popup_style):
+                    if self.has("popup_title"):
                         dp += ' -T "#[align=centre] yazi " '
                     w(f'bind -N "PopUp yazi"         {key_yazi}  {dp} yazi')
                     used_any_popups = True
@@ -754,7 +830,7 @@ class BaseConfig(TmuxConfig):
                     f'display-message "yazi not available"'
                 )
 
-        if used_any_popups and self.vers_ok(min_vers_popup_style):
+        if used_any_popups and self.has("popup_title"):
             w(f"{self.opt_win} popup-border-lines rounded")
         w()  # spacer
 
@@ -932,7 +1008,7 @@ class BaseConfig(TmuxConfig):
         #
         #  Splitting the entire window
         #
-        if self.vers_ok(2.3) and not self.is_tmate():
+        if self.has("full_size_split") and not self.is_tmate():
             #
             #  tmate does not support split-window -f  despite they claim
             #  to be 2.4 compatible and this is a 2.3 feature...
@@ -1089,7 +1165,7 @@ class BaseConfig(TmuxConfig):
         if self.vers_ok(3.2):
             w(f"{self.opt_pane} pane-border-lines single")
 
-        if self.vers_ok(3.3):
+        if self.has("pane_border_indicators"):
             w(f"{self.opt_pane} pane-border-indicators off")
 
         w("")  # spacer
@@ -1317,8 +1393,6 @@ class BaseConfig(TmuxConfig):
     def handle_hooks(self):
         w = self.write
 
-        v_min_smart_hooks = 3.2
-
         if not self.vers_ok(1.0):
             # Nothing hook related can be done, so abort
             return
@@ -1353,7 +1427,7 @@ class BaseConfig(TmuxConfig):
         # through to a potential inner tmux in the case of single or zoomed pane.
         # Stuff like pane navigation & resize etc.
         """)
-        if self.vers_ok(v_min_smart_hooks):
+        if self.has("if_shell_format_conditions"):
             binds_s = unbinds_s = ""
         else:
             w(
@@ -1364,7 +1438,7 @@ class BaseConfig(TmuxConfig):
             binds_s, unbinds_s = self.generate_old_style_binds()
         borders_enable = f"set -w pane-border-status top{binds_s}"
         borders_disable = f"set -w pane-border-status off{unbinds_s}"
-        if self.vers_ok(2.4) and not self.is_tmate():
+        if self.has("pane_border_status") and not self.is_tmate():
             # pane-border-status not available < 2.4
             # tmate doesn't support -w options in hooks - "no current session"
             #  Display pane border lines when more than one pane is present
@@ -1393,7 +1467,7 @@ class BaseConfig(TmuxConfig):
             idx = self.get_next_hook_array_idx()
             msg = "terminal clipboard is set"
 
-            if self.vers_ok(v_min_smart_hooks):
+            if self.has("if_shell_format_conditions"):
                 delay = "-d 400"
             else:
                 delay = ""
@@ -1404,7 +1478,7 @@ class BaseConfig(TmuxConfig):
                 set-hook -g pane-set-clipboard{idx} "display-message {delay} '{msg}'" """
             )
 
-        if self.vers_ok(v_min_smart_hooks):
+        if self.has("if_shell_format_conditions"):
             idx = self.get_next_hook_array_idx()
 
             #
@@ -1474,7 +1548,7 @@ class BaseConfig(TmuxConfig):
 
         unbinds_l = []
         for line in self.pane_un_zoomed_noprefix_binds:
-            unbinds_l.append(f"unbind -n {shlex.split(line)[4]}")
+            unbinds_l.append(f"unbind -n {tokenize(line).words[4]}")
         unbinds_s = " ; " + " ; ".join(unbinds_l)
 
         binds_l = []
@@ -1488,7 +1562,7 @@ class BaseConfig(TmuxConfig):
 
     def get_next_hook_array_idx(self):
         rslt = ""
-        if self.vers_ok(3.0):
+        if self.has("hook_arrays"):
             self.hook_array_index += 1
             rslt = f"[{self.hook_array_index}]"
         return rslt
@@ -1522,7 +1596,7 @@ if-shell -F '#{||:#{==:#{window_panes},1},#{!=:#{window_zoomed_flag},#{@zoom-sta
         )
 
         for s in self.pane_un_zoomed_noprefix_binds:
-            w(f"        unbind -n {shlex.split(s)[4]}", trim_ws=False)
+            w(f"        unbind -n {tokenize(s).words[4]}", trim_ws=False)
 
         # Debug helper add for each hook and state...
         # msg = "hook set zoom-state = #{@zoom-state}"
@@ -1560,7 +1634,7 @@ if-shell -F '#{||:#{==:#{window_panes},1},#{!=:#{window_zoomed_flag},#{@zoom-sta
         #
         #======================================================
         """)
-        if self.vers_ok(2.1):
+        if self.has("mouse_option"):
             w(f"{self.opt_ses} mouse on\n")
             self.mkscript_toggle_mouse()
             tgl_code = self.es.run_it(self._fnc_toggle_mouse)
@@ -1743,7 +1817,10 @@ if-shell -F '#{||:#{==:#{window_panes},1},#{!=:#{window_zoomed_flag},#{@zoom-sta
 
         self.sb_right = self.sb_right.replace(
             "USERNAME_TEMPLATE", self.username_template
-        ).replace("HOSTNAME_TEMPLATE", self.hostname_template)
+        ).replace(
+            "HOSTNAME_TEMPLATE",
+            self.hostname_template.replace("HOSTNAME_VALUE", mtc_utils.HOSTNAME),
+        )
 
         if not self.vers_ok(1.0):
             # setting colors in status line not supported
@@ -1838,7 +1915,7 @@ if-shell -F '#{||:#{==:#{window_panes},1},#{!=:#{window_zoomed_flag},#{@zoom-sta
             '$TMUX_BIN display-message \\"Generating plugin list\\" \\; '
             # 1st load venv if used
             f"[ -d {repo_dir}/.venv ] && . {repo_dir}/.venv/bin/activate \\; "
-            f"{__main__.__file__} -t $TMUX_BIN -p2 '{self.conf_file}'"
+            f"{self.source_file} -t $TMUX_BIN -p2 '{self.conf_file}'"
             '"'
         )
 
@@ -2180,7 +2257,19 @@ timer_end() {{
             )
             sys.exit(mtc_utils.ERROR_USER_KEY_NOT_OCTAL)
 
-        currency = mtc_utils.get_currency()
+        #  Never waits for a lookup, if not yet known a default is used, and
+        #  once the lookup is done, the fingerprint triggers a regeneration
+        #  A loaded environment snapshot is for another host, never look up
+        #  the local currency for it
+        currency = self.probes["currency"]
+        if not currency and not self.env_snapshot:
+            currency = mtc_utils.get_currency()
+        if not currency:
+            currency = mtc_utils.DEFAULT_CURRENCY
+            w(
+                "# Local currency not yet known, assuming: "
+                f"{currency} until it has been looked up"
+            )
         if sequence == "\\033\\100" and not self.vers_ok(3.0):
             # user-keys were introduced in 2.6, but until 3.0
             # tmux fails to handle the default sequence for this key, Esc-@
@@ -2191,17 +2280,12 @@ timer_end() {{
             w(f"""# M-S-2 mapped to €
                 set -s user-keys[180] "{sequence}"
                 bind -N "Send €" -n User180 send-keys "€" """)
-        elif currency:
+        else:
             w("# When checking EUR was not reported as local currency where this node")
             w(
                 "# is located, so no EUR fix applied. "
                 f"This node reports currency: {currency}."
             )
-        else:
-            w(
-                "# No default currency could be retrieved for this node - "
-                "alternate_key_euro() ignored"
-            )
         w()  # spacer
 
 
@@ -34,6 +34,8 @@ from pathlib import Path
 #
 import mtc_utils
 from base import BaseConfig
+from tmux_conf.plugins.order import plugin_order
+from tmux_conf.probes import Probes
 
 
 class DefaultPlugins(BaseConfig):  # pylint: disable=R0904
@@ -42,8 +44,8 @@ class DefaultPlugins(BaseConfig):  # pylint: disable=R0904
     definition, and handled as such by the TmuxConfig class.
 
     Plugins will be ordered alphabetically based on method name.
-    Normally order has no significance, but in some cases order is significant
-    therefore  the method handling "tmux-continuum" is named plugin_zz_continuum()
+    Normally order has no significance, but when it is, use the
+    plugin_order() decorator, as done for plugin_continuum()
 
     Syntax for plugins methods:
 
@@ -52,8 +54,11 @@ class DefaultPlugins(BaseConfig):  # pylint: disable=R0904
         plugin name - needed when installing it, and to identify it.
         code snippet defining plugin variables
 
-    Plugin definitions can use self.write() in their code block, but this
-    is not recommended, instead generate a string and supply as mentioned above
+    Each plugin method is only called once, during the plugin scan, when
+    writes to the config are ignored. If a plugin needs to use self.write(),
+    return a callable doing so as a fourth item, it is called once, before
+    the plugins are defined. This is not recommended, instead generate a
+    string and supply as mentioned above
 
     Calling self.plugins.installed(short_name=True) will give a name of
     all plugins that will be used, so can be used to define the status bar
@@ -79,9 +84,6 @@ class DefaultPlugins(BaseConfig):  # pylint: disable=R0904
     use_plugin_session_wizard = True
     use_plugin_suspend = True
 
-    if mtc_utils.IS_ISH:
-        use_plugin_session_wizard = False
-
     #
     # Replaced by corresponding use_plugin variables
     #
@@ -120,15 +122,23 @@ class DefaultPlugins(BaseConfig):  # pylint: disable=R0904
         """Disable plugins based on local env."""
         super().pre_plugin_checks()
 
+        if mtc_utils.IS_ISH:
+            self.use_plugin_session_wizard = False
+
         # For now only use the battery plugin on MacOS
         if not mtc_utils.IS_DARWIN:
             self.use_plugin_battery = False
 
         # Claude env is a directory structure
-        if self.use_plugin_claude and not (Path.home() / ".claude").is_dir():
+        if self.use_plugin_claude and not self.probes["claude_env"]:
             print("OVERRIDE: Disabling claude plugin due to no claude env!")
             self.use_plugin_claude = False
 
+    def declare_probes(self) -> Probes:
+        probes = super().declare_probes()
+        probes["claude_env"] = lambda: (Path.home() / ".claude").is_dir()
+        return probes
+
     def status_bar_customization(self, print_header: bool = True) -> bool:
         """This is called just before the status bar is rendered,
         local_overrides() is called later so can not modify status bar
@@ -485,14 +495,14 @@ class DefaultPlugins(BaseConfig):  # pylint: disable=R0904
             """,
         ]
 
-    def plugin_zz_continuum(self) -> list:  # 1.9
+    @plugin_order(after=("plugin_resurrect",), last=True)
+    def plugin_continuum(self) -> list:  # 1.9
         """Automatically save and restore tmux server's open sessions.
 
         Depends on the plugin tmux-resurrect for actual save/restore.
 
         Due to a "known issue" mentioned on the plugins GitHub page, this
-        plugin method name is intended to make sure this is the last
-        plugin defined. Here is this issue:
+        plugin is ordered to be the last plugin defined. Here is this issue:
 
         In order to be executed periodically, the plugin updates the
         status-right tmux variable. In case some plugin (usually themes)
@@ -11,8 +11,12 @@
 #
 #  Provided methods:
 #   run_shell()     - Runs a shell command, returns result as a str
-#   get_currency()  - Get local currency as a str, based on public IP#
-#  Provides constants:
+#   get_currency()  - Get local currency as a str, based on public IP
+#                     if not yet known, it is looked up in the background
+#
+#  Run as: mtc_utils.py --prefetch-currency  to look up and cache currency
+#
+#  Provides constants, computed on first use:
 #   HOSTNAME        hostname -s
 #   IS_REMOTE       (bool) if true this is a remote session via mosh/ssh etc
 #   IS_INNER_TMUX   (bool) this runs inside another tmux session
@@ -27,55 +31,136 @@ import json
 import os.path
 import platform
 import random
-import subprocess  # nosec
 import sys
+import time
+from collections.abc import Callable
 from pathlib import Path
 
+#  Kept cheap to import, modules only used by some functions are imported
+#  on first use, and typing is only needed by type checkers
+from tmux_conf.reset_hooks import on_reset
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+#
+#  Used until the actual currency has been looked up
+#
+DEFAULT_CURRENCY = "EUR"
+
+#  Can be set to use another service, or a local stand-in when testing
+CURRENCY_URL_ENV = "TMUX_CONF_CURRENCY_URL"
+
+#  A prefetch lock older than this is assumed to be left from a crash
+PREFETCH_LOCK_TIMEOUT = 60
+
 
 #
 #  Public methods
 #
 def run_shell(_cmd: str) -> str:
-    """Run a command in a shell"""
-    # pylint: disable=subprocess-run-check
-    result = subprocess.run(_cmd, capture_output=True, text=True, shell=True)  # nosec: B602
-    return result.stdout.strip()
+    """Run a command in a shell, prefer tmux_conf.processes.run_cmd()"""
+    from tmux_conf.processes import run_cmd  # pylint: disable=import-outside-toplevel
 
+    return run_cmd(["/bin/sh", "-c", _cmd])
 
-def get_currency() -> str:
+
+def get_currency(blocking: bool = False) -> str:
     """Get local currency, cached permanently since it's tied to keyboard layout.
 
     Performs a one-time network lookup on first run, then caches the result
     indefinitely. Since currency preference is tied to keyboard layout
     (not location), it doesn't change over time.
 
+    Unless blocking is True, the lookup is started in the background and
+    "" is returned, the next time the config is generated the cached
+    currency will be used.
+
     To refresh: rm ~/.cache/tmux_conf_currency
     """
-    cache_file = Path.home() / ".cache" / "tmux_conf_currency"
+    cached = cached_currency()
+    if cached or not blocking:
+        if not cached and not _prefetch_in_progress():
+            _spawn_prefetch()
+        return cached
+    return prefetch_currency()
 
-    # Try cache first (persistent, no TTL)
-    if cache_file.exists():
-        try:
-            cached = cache_file.read_text().strip()
-            if cached:
-                return cached
-        except OSError:
-            pass  # Ignore cache read errors, fall through to fetch
 
-    # Fetch from API on first run
-    currency = _get_currency_with_fallback()
+def cached_currency() -> str:
+    """Cached currency, "" if not yet looked up"""
+    try:
+        return currency_cache_file().read_text().strip()
+    except OSError:
+        return ""
 
-    # Cache the result permanently
-    if currency:
-        try:
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
-            cache_file.write_text(currency)
-        except OSError:
-            pass  # Ignore cache write errors
 
+def prefetch_currency() -> str:
+    """Look up currency and cache it, unless already cached.
+    If another lookup is in progress, "" is returned right away.
+    """
+    cached = cached_currency()
+    if cached:
+        return cached
+
+    cache_file = currency_cache_file()
+    lock_file = _prefetch_lock_file()
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        if not _prefetch_in_progress():
+            lock_file.unlink()
+    except OSError:
+        pass  # no lock present
+    try:
+        os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return ""  # already in progress, or cache dir not writable
+
+    currency = ""
+    try:
+        currency = _get_currency_with_fallback()
+        if currency:
+            # Cache the result permanently, the file is only seen once complete
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}")
+            tmp_file.write_text(currency)
+            os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # Ignore cache write errors
+    finally:
+        lock_file.unlink(missing_ok=True)
     return currency
 
 
+def _prefetch_lock_file() -> Path:
+    cache_file = currency_cache_file()
+    return cache_file.with_name(cache_file.name + ".lock")
+
+
+def _prefetch_in_progress() -> bool:
+    """A lock older than PREFETCH_LOCK_TIMEOUT is assumed to be left
+    from a crash, and does not count.
+    """
+    try:
+        age = time.time() - _prefetch_lock_file().stat().st_mtime
+    except OSError:
+        return False
+    return age <= PREFETCH_LOCK_TIMEOUT
+
+
+def _spawn_prefetch() -> None:
+    """Look up the currency in the background"""
+    # pylint: disable=import-outside-toplevel
+    from tmux_conf.processes import spawn_cmd
+    from tmux_conf.zipapp import script_command
+
+    spawn_cmd(script_command(os.path.abspath(__file__)) + ["--prefetch-currency"])
+
+
+def currency_cache_file() -> Path:
+    """Where the currency is cached"""
+    return Path.home() / ".cache" / "tmux_conf_currency"
+
+
 def _get_currency_with_fallback() -> str:
     """Fetch currency from APIs with fallback, order randomized."""
     currency_functions = [
@@ -104,8 +189,10 @@ def _get_currency_with_fallback() -> str:
 #
 def _currency_request(url, tag="currency") -> str:
     """Returns currency for device location, or "" if not detected"""
+    from tmux_conf.processes import run_cmd  # pylint: disable=import-outside-toplevel
+
     try:
-        result = run_shell(f"curl -s --max-time 2 {url}")
+        result = run_cmd(["curl", "-s", "--max-time", "2", url], timeout=5)
         if result.strip():
             data = json.loads(result)
             return data.get(tag, "")
@@ -116,7 +203,8 @@ def _currency_request(url, tag="currency") -> str:
 
 def _get_currency_from_ipwhois():
     """retrieving currency"""
-    return _currency_request("https://ipwhois.app/json/", "currency_code")
+    url = os.getenv(CURRENCY_URL_ENV) or "https://ipwhois.app/json/"
+    return _currency_request(url, "currency_code")
 
 
 def _get_currency_from_ipapi() -> str:
@@ -125,22 +213,28 @@ def _get_currency_from_ipapi() -> str:
 
 
 def _get_short_hostname():
+    # pylint: disable=import-outside-toplevel
+    import socket
+
+    from tmux_conf.processes import run_cmd
+
     # print(f"><> HOSTNAME_SHORT: {os.getenv("HOSTNAME_SHORT")}")
+    home = _home()
     for cmd in [
-        f"{HOME}/.local/bin/hostname",
-        f"{HOME}/bin/hostname",
+        f"{home}/.local/bin/hostname",
+        f"{home}/bin/hostname",
         "/usr/local/bin/hostname",
     ]:
         # print(f"><> iterating over {cmd}")
         f_name = Path(cmd)
         if f_name.is_file() and os.access(f_name, os.X_OK):
-            h_name = run_shell(f"{cmd} -s")
+            h_name = run_cmd([cmd, "-s"])
             # print(f"><> mtc_utils._get_short_hostname() using: {f_name} gpt: {h_name}")
             return h_name
 
-    # no custom hostname found, use the regulat one
+    # no custom hostname found, use the regular one, same as: hostname -s
     # print("><> Using default hostname")
-    return run_shell("hostname -s")
+    return socket.gethostname().split(".")[0]
 
 
 # ===============================================================
@@ -150,59 +244,86 @@ def _get_short_hostname():
 # ===============================================================
 
 
-HOME = os.getenv("HOME") or ""
-if not HOME:
-    sys.exit("env HOME not found")
-
-
-#
-# I keep track on if it is a remote session, to be able to figure out if
-# this session is using a limited console like if running on an iSH node.
-# It can also be used to disable unintentionally activated multi-media related
-# plugins. not much point trying to stream audio on a cloud hosted node.
-#
-IS_REMOTE = bool(os.getenv("SSH_CLIENT"))
+def _home() -> str:
+    home = os.getenv("HOME") or ""
+    if not home:
+        sys.exit("env HOME not found")
+    return home
 
-#
-# I often test things out on a separate tmux instance, that can either run
-# standalone or inside the other.
-# TMUX_OUTER indicates that one of my envs runs inside the other. In such cases
-# any attempt to restart the outer inside the inner is refused to avoid
-# bizarre recursive screen updates, and getting disconnected since if the outer
-# disconnects the previously inner normally also disappears.
-#
-term = os.getenv("TERM") or ""
-IS_INNER_TMUX = bool(os.getenv("TMUX_OUTER")) or term.find("tmux") > -1
 
-#
-#  If the session originated on a "primitive keyboard" console, such as
-#  iSH or Termux, it is indicated in LC_CONSOLE
-#
-LC_CONSOLE = os.getenv("LC_CONSOLE") or ""
+def _is_inner_tmux() -> bool:
+    term = os.getenv("TERM") or ""
+    return bool(os.getenv("TMUX_OUTER")) or term.find("tmux") > -1
 
-#
-#  Hosts with limited consoles should also list what keyboard they are using
-#  in order for tablet_kbd.py to make correct workarounds
-#
-LC_KEYBOARD = os.getenv("LC_KEYBOARD") or ""
 
 #
-#   List hostname where session started, purely informational
+#  These are computed on first use, and then kept as regular globals, so
+#  importing this does not cost anything, and only values used are computed.
 #
-LC_ORIGIN = os.getenv("LC_ORIGIN") or ""
-
-HOSTNAME = os.getenv("HOSTNAME_SHORT") or _get_short_hostname()
-if HOSTNAME:
-    HOSTNAME.lower()
-else:
-    HOSTNAME = "no_host_name"
+_LAZY: "dict[str, Callable[[], Any]]" = {
+    "HOME": _home,
+    #
+    # I keep track on if it is a remote session, to be able to figure out if
+    # this session is using a limited console like if running on an iSH node.
+    # It can also be used to disable unintentionally activated multi-media
+    # related plugins. not much point trying to stream audio on a cloud
+    # hosted node.
+    #
+    "IS_REMOTE": lambda: bool(os.getenv("SSH_CLIENT")),
+    #
+    # I often test things out on a separate tmux instance, that can either run
+    # standalone or inside the other.
+    # TMUX_OUTER indicates that one of my envs runs inside the other. In such
+    # cases any attempt to restart the outer inside the inner is refused to
+    # avoid bizarre recursive screen updates, and getting disconnected since
+    # if the outer disconnects the previously inner normally also disappears.
+    #
+    "IS_INNER_TMUX": _is_inner_tmux,
+    #
+    #  If the session originated on a "primitive keyboard" console, such as
+    #  iSH or Termux, it is indicated in LC_CONSOLE
+    #
+    "LC_CONSOLE": lambda: os.getenv("LC_CONSOLE") or "",
+    #
+    #  Hosts with limited consoles should also list what keyboard they are
+    #  using in order for tablet_kbd.py to make correct workarounds
+    #
+    "LC_KEYBOARD": lambda: os.getenv("LC_KEYBOARD") or "",
+    #
+    #   List hostname where session started, purely informational
+    #
+    "LC_ORIGIN": lambda: os.getenv("LC_ORIGIN") or "",
+    "HOSTNAME": lambda: (
+        os.getenv("HOSTNAME_SHORT") or _get_short_hostname() or "no_host_name"
+    ),
+    "IS_DARWIN": lambda: platform.system() == "Darwin",
+    "IS_ISH": lambda: os.path.isdir("/proc/ish"),
+    "IS_TERMUX": lambda: os.getenv("TERMUX_VERSION") is not None,
+    "IS_GHOSTTY": lambda: os.getenv("TERM_PROGRAM") == "ghostty",
+}
+
+
+def __getattr__(name: str) -> "Any":
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = _LAZY[name]()
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
+
+def reset() -> None:
+    """Forget computed values, they are computed again on next use"""
+    for name in _LAZY:
+        globals().pop(name, None)
+
+
+#  The generator daemon runs profiles in other environments
+on_reset(reset)
 
 
-IS_DARWIN = platform.system() == "Darwin"
-IS_ISH = os.path.isdir("/proc/ish")
-IS_TERMUX = os.getenv("TERMUX_VERSION") is not None
-IS_GHOSTTY: bool = os.getenv("TERM_PROGRAM") == "ghostty"
-
 # muc keys and default values
 K_M_PLUS = "M-+"
 K_M_UNDERSCORE = "M-_"
@@ -221,3 +342,10 @@ ERROR_MISSING_KEY_IN_MUC_KEYS = 65
 ERROR_USER_KEY_NOT_OCTAL = 65
 ERROR_T2_USING_DEF_TMUX_CONF = 67
 ERROR_STYLE_REDEFINED = 68
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--prefetch-currency"]:
+        print(prefetch_currency() or "Failed to look up currency")
+    else:
+        sys.exit(f"Usage: {os.path.basename(__file__)} --prefetch-currency")
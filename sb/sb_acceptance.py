@@ -32,7 +32,7 @@ class SB(DefaultPlugins):
         self.assign_style(__file__)
         super().status_bar_customization(print_header=print_header)
 
-        if self.vers_ok("1.9"):
+        if self.has("styles"):
             self.write(f"set -g status-style fg={fg_clr},bg={bg_clr}")
         else:
             self.write(f"""
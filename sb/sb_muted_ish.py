@@ -50,7 +50,7 @@ class SB(DefaultPlugins):
         w(f'set -g window-status-current-format "#[fg={THEME_TEXT}]#W"')
         w("set -g status-justify centre")
 
-        if self.vers_ok("1.9"):
+        if self.has("styles"):
             # medium white on grey
             w('set -g message-style "fg=colour251,bg=colour8"')
             w('set -g mode-style "fg=colour251,bg=colour8"')
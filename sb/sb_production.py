@@ -18,7 +18,6 @@ root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, root_dir)
 
 # pylint: disable=wrong-import-position,import-error
-import mtc_utils  # noqa: E402 # can't be at top
 from default_plugins import DefaultPlugins  # noqa: E402 # can't be at top
 
 
@@ -26,7 +25,7 @@ from default_plugins import DefaultPlugins  # noqa: E402 # can't be at top
 class SB(DefaultPlugins):
     """Style production node"""
 
-    hostname_template: str = f"#[bg=colour195,fg=colour1]{mtc_utils.HOSTNAME}#[default]"
+    hostname_template: str = "#[bg=colour195,fg=colour1]HOSTNAME_VALUE#[default]"
     tpm_initializing: str = "#[fg=yellow bg=black blink] tpm initializing...#[default]"
 
     force_plugin_continuum = True
@@ -38,7 +37,7 @@ class SB(DefaultPlugins):
         self.assign_style(__file__)
         super().status_bar_customization(print_header=print_header)
 
-        if self.vers_ok("1.9"):
+        if self.has("styles"):
             self.write(f"set -g status-style fg={fg_clr},bg={bg_clr}")
         else:
             self.write(f"""
@@ -33,7 +33,7 @@ class SB(DefaultPlugins):
         self.assign_style(__file__)
         super().status_bar_customization(print_header=print_header)
 
-        if self.vers_ok("1.9"):
+        if self.has("styles"):
             self.mkscript_rev_sb_color()
             self.write(f"set -g status-style fg={fg_clr},bg={bg_clr}")
             self.write(self.es.run_it(self.fnc_rev_sb_color))
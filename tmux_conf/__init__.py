@@ -9,6 +9,24 @@
 """base packet imports"""
 
 from .constants import __version__
-from .tmux_conf import TmuxConfig
+
+#  Not imported from typing, this is imported by mtc_utils, and should be cheap
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from .tmux_conf import TmuxConfig
 
 __all__ = ["TmuxConfig", "__version__"]
+
+
+def __getattr__(name: str) -> "Any":
+    #
+    #  TmuxConfig is imported on first use, so that tools in this package,
+    #  like source_map, can be run without loading the config generator.
+    #
+    if name == "TmuxConfig":
+        from .tmux_conf import TmuxConfig  # pylint: disable=import-outside-toplevel
+
+        return TmuxConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
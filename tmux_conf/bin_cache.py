@@ -0,0 +1,160 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Remembers what was learned about a tmux binary
+
+Probing a binary means starting it, on slow hosts that is noticeable.
+Results are saved in ~/.cache/tmux_conf/tmux_bins.json, keyed on the
+resolved path of the binary, its inode, size and mtime, so a binary that
+is replaced, rebuilt or upgraded is probed again.
+
+asdf shims are resolved in Python, into the binary of the version asdf
+would select, using the same rules asdf does. Installing or switching
+version thus changes what binary is identified, without any need to
+clear the cache.
+"""
+
+import contextlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from .utils import cache_dir
+
+CACHE_VERSION = 1
+CACHE_FILE_NAME = "tmux_bins.json"
+
+#  Limit the size, old binaries are not removed from the cache otherwise
+MAX_ENTRIES = 50
+
+
+@dataclass(frozen=True)
+class BinaryId:
+    """Identifies the content of a binary, without reading it"""
+
+    path: str  # resolved path
+    inode: int
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: str) -> "BinaryId | None":
+        """None if path can't be examined"""
+        real_path = os.path.realpath(path)
+        try:
+            st = os.stat(real_path)
+        except OSError:
+            return None
+        return cls(real_path, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def key(self) -> str:
+        return f"{self.path}:{self.inode}:{self.size}:{self.mtime_ns}"
+
+
+def asdf_data_dir() -> str:
+    return os.environ.get("ASDF_DATA_DIR") or os.path.expanduser("~/.asdf")
+
+
+def is_asdf_shim(path: str) -> bool:
+    return os.path.dirname(path) == os.path.join(asdf_data_dir(), "shims")
+
+
+def asdf_selected_version(tool: str) -> str:
+    """The version of tool asdf would use here, "" if not defined.
+
+    Checks ASDF_<TOOL>_VERSION, then .tool-versions from current dir
+    upwards, and finally the default tool-versions file in HOME.
+    """
+    env_vers = os.environ.get(f"ASDF_{tool.upper()}_VERSION")
+    if env_vers:
+        return env_vers
+
+    f_name = os.environ.get("ASDF_DEFAULT_TOOL_VERSIONS_FILENAME", ".tool-versions")
+    folder = Path.cwd()
+    candidates = [d / f_name for d in (folder, *folder.parents)]
+    candidates.append(Path.home() / f_name)
+    for tool_versions in candidates:
+        try:
+            lines = tool_versions.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            words = line.split("#")[0].split()
+            if len(words) > 1 and words[0] == tool:
+                return words[1]  # first listed version is used
+    return ""
+
+
+def resolve_asdf_shim(path: str) -> str:
+    """The binary an asdf shim would run, "" if it can't be determined,
+    such as when the system version is selected.
+    """
+    tool = os.path.basename(path)
+    vers = asdf_selected_version(tool)
+    if not vers or vers == "system":
+        return ""
+    if vers.startswith("path:"):
+        install_dir = vers[len("path:") :]
+    else:
+        install_dir = os.path.join(asdf_data_dir(), "installs", tool, vers)
+    f_name = os.path.join(install_dir, "bin", tool)
+    return f_name if os.access(f_name, os.X_OK) else ""
+
+
+class BinaryCache:
+    """Probe results per binary, each entry is a dict of str values"""
+
+    def __init__(self, f_name: Path | None = None) -> None:
+        self.f_name = f_name or cache_dir() / CACHE_FILE_NAME
+        self._entries: dict[str, dict[str, str]] | None = None
+
+    def get(self, bin_id: BinaryId) -> dict[str, str] | None:
+        return self._load().get(bin_id.key())
+
+    def put(self, bin_id: BinaryId, data: dict[str, str]) -> None:
+        entries = self._load()
+        entries.pop(bin_id.key(), None)
+        entries[bin_id.key()] = data  # most recent last
+        while len(entries) > MAX_ENTRIES:
+            del entries[next(iter(entries))]
+        self._save()
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.f_name, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self._entries = data["entries"]
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass  # missing or damaged, will be replaced
+        return self._entries
+
+    def _save(self) -> None:
+        """A failure to save just means the next run probes again"""
+        # pylint: disable-next=import-outside-toplevel
+        import tempfile  # only needed when something new was probed
+
+        data = {"version": CACHE_VERSION, "entries": self._entries}
+        try:
+            self.f_name.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=self.f_name.parent, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_file, self.f_name)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_file)
@@ -0,0 +1,118 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""What a tmux binary supports, found by asking it
+
+A server is started on a private socket, without any config, and asked
+to list its commands, options and hooks. This starts the binary a few
+times, so results are kept in the binary cache, see bin_cache.py.
+
+Features in features.py with a probe are then answered by the binary,
+instead of by comparing versions, see VersionCheck.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+
+from .processes import run_cmd
+
+#  Flags in a list-commands usage line, like [-dErx] or [-c dir]
+_FLAGS_RE = re.compile(r"\[-([A-Za-z0-9]+)")
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """Commands with their flags, and names of options and hooks"""
+
+    commands: dict[str, str]  # name -> flags
+    options: frozenset[str]
+    hooks: frozenset[str]
+
+    def has(self, probe: str) -> bool:
+        """probe is one of:  cmd:NAME  cmd:NAME:FLAG  opt:NAME  hook:NAME"""
+        kind, _, item = probe.partition(":")
+        if kind == "cmd":
+            name, _, flag = item.partition(":")
+            return name in self.commands and flag in self.commands[name]
+        if kind == "opt":
+            return item in self.options
+        if kind == "hook":
+            return item in self.hooks
+        raise ValueError(f"Bad capability probe: {probe}")
+
+    def to_cache(self) -> dict[str, str]:
+        """As str values, for the binary cache"""
+        return {
+            "commands": " ".join(f"{k}:{v}" for k, v in sorted(self.commands.items())),
+            "options": " ".join(sorted(self.options)),
+            "hooks": " ".join(sorted(self.hooks)),
+        }
+
+    @classmethod
+    def from_cache(cls, data: dict[str, str]) -> "Capabilities | None":
+        """None if data does not hold capabilities"""
+        if "commands" not in data:
+            return None
+        commands = dict(item.split(":", 1) for item in data["commands"].split())
+        return cls(
+            commands=commands,
+            options=frozenset(data["options"].split()),
+            hooks=frozenset(data["hooks"].split()),
+        )
+
+
+def parse_commands(output: str) -> dict[str, str]:
+    """list-commands output, as name -> flags"""
+    commands = {}
+    for line in output.splitlines():
+        name, _, usage = line.partition(" ")
+        if name:
+            commands[name] = "".join(_FLAGS_RE.findall(usage))
+    return commands
+
+
+def parse_names(output: str) -> frozenset[str]:
+    """First word of each line, without any array index"""
+    names = set()
+    for line in output.splitlines():
+        name = line.split(" ", 1)[0].split("[", 1)[0]
+        if name and not name.startswith("@"):  # user options
+            names.add(name)
+    return frozenset(names)
+
+
+def probe_capabilities(tmux_bin: str) -> Capabilities | None:
+    """Ask tmux_bin what it supports, None if it could not be started"""
+    #  Old versions refuse to run if TMUX is set
+    tmux = ["env", "-u", "TMUX", os.path.expanduser(tmux_bin)]
+    tmux += ["-L", f"tmux_conf_probe-{os.getpid()}", "-f", "/dev/null"]
+    run_cmd(tmux + ["new-session", "-d"])
+    try:
+        commands = parse_commands(run_cmd(tmux + ["list-commands"]))
+        if not commands:
+            return None
+        options = parse_names(
+            "\n".join(
+                run_cmd(tmux + params)
+                for params in (
+                    ["show-options", "-s"],
+                    ["show-options", "-g"],
+                    ["show-window-options", "-g"],
+                )
+            )
+        )
+        hooks: frozenset[str] = frozenset()
+        if "show-hooks" in commands:
+            hooks = parse_names(run_cmd(tmux + ["show-hooks", "-g"]))
+    finally:
+        run_cmd(tmux + ["kill-server"])
+    return Capabilities(commands, options, hooks)
@@ -0,0 +1,117 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Metadata in the header of a generated config
+
+    python3 tmux_conf/conf_header.py [-k KEY] CONF_FILE
+
+Only the start of the config is read, the header is always found there.
+The fingerprint of what the config was generated from is not part of the
+config, it is read from the sidecar file meta_file_for(), written by
+OutputEngine. Without -k all items are listed as key: value, with -k only the value of
+that item is printed, or nothing if it was not found.
+
+Only the standard library is used, so this can be run by path, without
+importing the config generator.
+"""
+
+import json
+import sys
+from dataclasses import asdict, dataclass, fields
+
+LIB_VERSION_LABEL = "tmux-conf:"
+
+#  The header is written first, no need to read further
+HEADER_SCAN_SIZE = 4096
+
+#  Env variables in the header, and the ConfHeader field holding them
+_VARIABLES = {
+    "TMUX_BIN": "tmux_bin",
+    "TMUX_CONF": "conf_file",
+    "TMUX_SOURCE": "source",
+}
+
+
+@dataclass(frozen=True)
+class ConfHeader:
+    """Items found in the header, "" if not present"""
+
+    tmux_bin: str = ""
+    conf_file: str = ""
+    source: str = ""  # profile that generated the config
+    lib_version: str = ""  # of tmux-conf
+    fingerprint: str = ""  # from the sidecar file, see fingerprint.py
+
+
+def meta_file_for(conf_file: str) -> str:
+    """Sidecar file with info about when, and from what, conf_file was written"""
+    return f"{conf_file}.meta"
+
+
+def read_meta(conf_file: str) -> dict[str, str]:
+    """Items in the sidecar file of conf_file, empty if it could not be read"""
+    try:
+        with open(meta_file_for(conf_file), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def parse_conf_header(header: str, fingerprint: str = "") -> ConfHeader:
+    """Items found in the start of a config"""
+    items: dict[str, str] = {"fingerprint": fingerprint}
+    for line in header.split("\n"):
+        if line.startswith("#"):
+            if LIB_VERSION_LABEL in line and "lib_version" not in items:
+                items["lib_version"] = line.split(LIB_VERSION_LABEL, 1)[1].strip()
+            continue
+        name, sep, value = line.partition("=")
+        if sep and name in _VARIABLES:
+            items[_VARIABLES[name]] = value.strip().strip('"')
+            if name == "TMUX_SOURCE":
+                break  # last item in the header
+    return ConfHeader(**items)
+
+
+def read_conf_header(conf_file: str) -> ConfHeader | None:
+    """Header of conf_file, None if it could not be read"""
+    try:
+        with open(conf_file, encoding="utf-8", errors="replace") as f:
+            header = f.read(HEADER_SCAN_SIZE)
+    except OSError:
+        return None
+    return parse_conf_header(header, read_meta(conf_file).get("fingerprint", ""))
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    key = ""
+    if len(args) == 3 and args[0] == "-k":
+        key = args[1]
+        args = args[2:]
+    keys = [f.name for f in fields(ConfHeader)]
+    if len(args) != 1 or (key and key not in keys):
+        print(f"Usage: {sys.argv[0]} [-k {'|'.join(keys)}] CONF_FILE")
+        return 1
+    header = read_conf_header(args[0])
+    if header is None:
+        return 1
+    if key:
+        print(getattr(header, key))
+    else:
+        for k, v in asdict(header).items():
+            print(f"{k}: {v}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Resident config generator, listening on a Unix socket
+
+    python3 -m tmux_conf.daemon start|stop|status|serve
+
+Starting Python and importing a profile with all the modules it uses is
+often most of the time spent generating a config. The daemon keeps them
+loaded, and runs profiles on request from daemon_client.py, one at a time.
+
+Each run executes the profile as __main__, with the options, environment
+and current directory of the client, and returns its output and exit
+code. Modules keeping state computed from the environment register a
+hook with reset_hooks.on_reset(), hooks are called before each run.
+
+If the source of any loaded module has changed, the request is refused
+as stale, so the client does a cold run, and the daemon restarts itself
+to load the new code.
+"""
+
+import contextlib
+import io
+import json
+import os
+import runpy
+import socketserver
+import sys
+import time
+import traceback
+from typing import Any
+
+from .daemon_client import ENCODING, is_private, send_request, socket_dir, socket_path
+from .processes import PROCESSES, spawn_cmd
+from .reset_hooks import on_reset, reset_all
+
+#  Modules from here are not watched for changes
+_STDLIB_DIR = os.path.dirname(os.__file__)
+
+on_reset(PROCESSES.calls.clear)
+
+
+class SourceWatch:
+    """Notices changes in the source of loaded modules"""
+
+    def __init__(self) -> None:
+        self._mtimes: dict[str, int] = {}
+
+    def update(self) -> None:
+        """Start watching modules loaded since last call"""
+        for module in list(sys.modules.values()):
+            f_name = getattr(module, "__file__", None)
+            if not f_name or f_name in self._mtimes:
+                continue
+            if f_name.startswith(_STDLIB_DIR) and "site-packages" not in f_name:
+                continue
+            with contextlib.suppress(OSError):
+                self._mtimes[f_name] = os.stat(f_name).st_mtime_ns
+
+    def changed(self) -> list[str]:
+        changed = []
+        for f_name, mtime in self._mtimes.items():
+            try:
+                if os.stat(f_name).st_mtime_ns != mtime:
+                    changed.append(f_name)
+            except OSError:
+                changed.append(f_name)
+        return changed
+
+
+def run_profile(argv: list[str], cwd: str, env: dict[str, str]) -> tuple[int, str]:
+    """Run profile argv[0] as if it was run from the command line,
+    returns exit code and output.
+    """
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    saved_path = list(sys.path)
+    saved_argv = list(sys.argv)
+    output = io.StringIO()
+    rc = 0
+    try:
+        os.environ.clear()
+        os.environ.update(env)
+        os.chdir(cwd)
+        sys.argv = list(argv)
+        sys.path.insert(0, os.path.dirname(argv[0]))  # as for a script
+        reset_all()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                runpy.run_path(argv[0], run_name="__main__")
+            except SystemExit as exc:
+                if exc.code is None or isinstance(exc.code, int):
+                    rc = exc.code or 0
+                else:
+                    print(exc.code, file=sys.stderr)
+                    rc = 1
+            #  Reported like an uncaught exception in a cold run would be
+            except Exception:  # noqa: BLE001 pylint: disable=broad-exception-caught
+                traceback.print_exc()
+                rc = 1
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        sys.argv = saved_argv
+    return rc, output.getvalue()
+
+
+class GeneratorDaemon(socketserver.UnixStreamServer):
+    """Handles one request at a time, until stopped"""
+
+    def __init__(self, path: str) -> None:
+        self.watch = SourceWatch()
+        self.watch.update()
+        self.started = time.time()
+        self.runs = 0
+        self.done = False
+        self.restart = False
+        old_umask = os.umask(0o177)  # only this user can connect
+        try:
+            super().__init__(path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        cmd = request.get("cmd")
+        if cmd == "run":
+            if self.watch.changed():
+                self.done = self.restart = True
+                return {"stale": True}
+            rc, output = run_profile(request["argv"], request["cwd"], request["env"])
+            self.runs += 1
+            self.watch.update()  # modules imported by this run
+            return {"rc": rc, "output": output}
+        if cmd == "status":
+            return {
+                "pid": os.getpid(),
+                "runs": self.runs,
+                "uptime": round(time.time() - self.started),
+            }
+        if cmd == "stop":
+            self.done = True
+            return {"stopped": os.getpid()}
+        return {"error": f"unknown cmd: {cmd}"}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """A request and its reply are a single line of JSON each"""
+
+    server: GeneratorDaemon
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        reply = self.server.dispatch(request)
+        self.wfile.write(json.dumps(reply).encode(ENCODING) + b"\n")
+
+
+def serve() -> int:
+    path = socket_path()
+    if send_request({"cmd": "status"}, timeout=2):
+        print(f"Already running, listening on: {path}")
+        return 1
+    folder = socket_dir()
+    with contextlib.suppress(FileExistsError):
+        os.mkdir(folder, 0o700)
+    if not is_private(folder) or not os.path.isdir(folder):
+        print(f"Not serving, {folder} must be a folder only accessible by you")
+        return 1
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)  # left behind by a daemon that died
+    start_cwd = os.getcwd()
+    server = GeneratorDaemon(path)
+    try:
+        while not server.done:
+            server.handle_request()
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+    if server.restart:
+        os.chdir(start_cwd)
+        os.execv(sys.executable, sys.orig_argv)  # nosec B606
+    return 0
+
+
+def main() -> int:
+    cmd = sys.argv[1] if len(sys.argv) == 2 else ""
+    if cmd == "serve":
+        return serve()
+    if cmd == "start":
+        if send_request({"cmd": "status"}, timeout=2):
+            print("Already running")
+            return 1
+        spawn_cmd([sys.executable, "-m", "tmux_conf.daemon", "serve"])
+        print(f"Started, will listen on: {socket_path()}")
+        return 0
+    if cmd in ("stop", "status"):
+        reply = send_request({"cmd": cmd}, timeout=10)
+        if not reply:
+            print("Not running")
+            return 1
+        print(", ".join(f"{k}: {v}" for k, v in reply.items()))
+        return 0
+    print("Usage: python3 -m tmux_conf.daemon start|stop|status|serve")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
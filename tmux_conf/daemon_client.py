@@ -0,0 +1,104 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Runs a profile using the generator daemon, if it is running
+
+    python3 tmux_conf/daemon_client.py PROFILE [profile options]
+
+The profile is run by the daemon, in the current directory and with the
+current environment, its output and exit code are passed on. If the
+daemon is not running, or has noticed that its code has changed, the
+profile is run directly instead.
+
+Only the standard library is used, so this can be run by path, without
+importing the config generator. See daemon.py for the server side.
+"""
+
+import json
+import os
+import socket
+import sys
+
+#  Requests and replies are a single line of JSON each
+ENCODING = "utf-8"
+
+
+def socket_dir() -> str:
+    """Folder holding the socket, per user and only accessible by that user"""
+    base = os.getenv("XDG_RUNTIME_DIR") or os.getenv("TMPDIR") or "/tmp"  # nosec B108
+    return os.path.join(base, f"tmux_conf-{os.getuid()}")
+
+
+def socket_path() -> str:
+    """Where the daemon listens"""
+    return os.path.join(socket_dir(), "daemon.sock")
+
+
+def is_private(path: str) -> bool:
+    """True if path is owned by this user, and nobody else has access.
+    Symlinks are not followed, so one placed by someone else fails this.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def send_request(request: dict, timeout: float | None = None) -> dict | None:
+    """The reply from the daemon, None if it is not running.
+
+    The request includes the environment, so it is only sent to a socket
+    created by this user.
+    """
+    if not (is_private(socket_dir()) and is_private(socket_path())):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path())
+            sock.sendall(json.dumps(request).encode(ENCODING) + b"\n")
+            with sock.makefile("r", encoding=ENCODING) as f:
+                reply = f.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(reply)
+    except ValueError:
+        return None  # daemon terminated without replying
+
+
+def run_profile(argv: list[str]) -> int:
+    """Run profile argv[0] with argv[1:] as its options"""
+    reply = send_request(
+        {
+            "cmd": "run",
+            "argv": [os.path.abspath(argv[0])] + argv[1:],
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+    )
+    if not reply or reply.get("stale"):
+        #  Cold run, replaces this process
+        os.execv(sys.executable, [sys.executable] + argv)  # nosec B606
+    sys.stdout.write(reply["output"])
+    return reply["rc"]
+
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print(f"Usage: {os.path.basename(sys.argv[0])} PROFILE [profile options]")
+        return 1
+    return run_profile(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
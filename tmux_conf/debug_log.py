@@ -0,0 +1,79 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Buffered debug log
+
+Each entry is a JSON record on its own line. For lines written to the
+config the record holds the line, the method that wrote it, the
+vers_ok() checks done since the previous line and a timestamp
+(seconds since the log was started).
+
+Records are kept in memory, and written by close() once generation is
+done, or when the process exits, if it was aborted.
+"""
+
+import atexit
+import json
+import time
+from pathlib import Path
+
+from .provenance import Origin
+
+
+class DebugLog:
+    """Collects debug records, written to log_file on flush()"""
+
+    def __init__(self, log_file: Path) -> None:
+        self.log_file = log_file
+        self._t_start = time.monotonic()
+        self._records: list[str] = []
+        self._vers_checks: list[tuple[str, bool]] = []
+        #  Ensure the log is saved even if generation is aborted
+        atexit.register(self.flush)
+
+    def vers_check(self, vers: int | float | str, result: bool) -> None:
+        """Recorded with the next line written"""
+        self._vers_checks.append((str(vers), result))
+
+    def line(self, line: str, origin: Origin | None) -> None:
+        """A line written to the config"""
+        record = {
+            "t": self._timestamp(),
+            "line": line,
+            "origin": origin.qualname if origin else "",
+            "src": f"{origin.file_name}:{origin.line_no}" if origin else "",
+            "vers_ok": self._vers_checks,
+        }
+        self._vers_checks = []
+        self._records.append(json.dumps(record))
+
+    def message(self, msg: str) -> None:
+        """Anything else worth logging"""
+        self._records.append(json.dumps({"t": self._timestamp(), "msg": msg}))
+
+    def flush(self) -> None:
+        """Write all records, can be called more than once"""
+        if not self._records:
+            return
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write("\n".join(self._records) + "\n")
+        self._records = []
+
+    def close(self) -> None:
+        """Write all records, and stop waiting for the process to exit.
+        A daemon running many profiles would otherwise keep every log
+        until it terminates.
+        """
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def _timestamp(self) -> float:
+        return round(time.monotonic() - self._t_start, 6)
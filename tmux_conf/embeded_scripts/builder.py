@@ -10,10 +10,10 @@ Defines a  run-shell to call a specific script
 """
 
 import os
+import shutil
 import sys
 from typing import Any
 
-from ..utils import run_shell
 from .config import RunCmdConfig
 from .spec import ScriptSpec
 
@@ -62,7 +62,7 @@ class CmdBuilder:  # pylint: disable=too-few-public-methods
 
     def _ensure_bash(self) -> str:
         if not self._cached_bash:
-            detected_bash = run_shell("command -v bash")
+            detected_bash = self.cfg.bash or shutil.which("bash")
             if not detected_bash:
                 sys.exit("Failed to find bash!")
             self._cached_bash = detected_bash
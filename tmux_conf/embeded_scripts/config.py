@@ -22,3 +22,4 @@ class RunCmdConfig:
     use_embedded: bool
     plugin_handler: str
     vers: VersionCheck  # the VersionCheck instance
+    bash: str = ""  # full path, if empty it is looked up when needed
@@ -14,6 +14,7 @@ import pathlib
 import stat
 import sys
 
+from ..provenance import Origin
 from ..utils import tilde_home_dir
 from .builder import CmdBuilder
 from .config import RunCmdConfig
@@ -34,7 +35,7 @@ class ScriptEmitter:
             cfg=cfg,
             external_resolver=self.external_path,
         )
-        self._embedded_text: list[str] = []
+        self._embedded_text: list[tuple[str, Origin | None]] = []
 
     def run_cmd(self, spec: ScriptSpec, in_bg: bool = False) -> str:
         """Generate a run-shell entry for the script"""
@@ -47,26 +48,29 @@ class ScriptEmitter:
         else:
             self._emit_external(spec)
 
-    def embedded_block(self) -> list[str]:
+    def embedded_block(self) -> list[tuple[str, Origin | None]]:
         """
         Docstring for embedded_block
 
         :param self: Description
         :return: Description
-        :rtype: list[str]
+        :rtype: list[tuple[str, Origin | None]]
         """
         if not (self._builder.cfg.use_embedded and self._embedded_text):
             return []
 
-        out = [
-            """
+        out: list[tuple[str, Origin | None]] = [
+            (
+                """
         #======================================================
         #
         # EMBEDDED-SCRIPTS-STARTING-POINT
-        #"""
+        #""",
+                None,
+            )
         ]
         out.extend(self._embedded_text)
-        out.append('# "$@" #  This triggers the embedded script')
+        out.append(('# "$@" #  This triggers the embedded script', None))
         return out
 
     def external_path(self, spec: ScriptSpec) -> str:
@@ -77,8 +81,8 @@ class ScriptEmitter:
         for line in spec.lines:
             # support multi-line chunks
             for part in line.split("\n"):
-                self._embedded_text.append(f"# {part}")
-        self._embedded_text.append("")  # separator
+                self._embedded_text.append((f"# {part}", spec.origin))
+        self._embedded_text.append(("", spec.origin))  # separator
 
     def _emit_external(self, spec: ScriptSpec) -> None:
         script_dir = self._script_dir()
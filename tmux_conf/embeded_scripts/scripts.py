@@ -10,8 +10,10 @@ Handles Embedded scripts
 """
 
 import os
+import sys
 from typing import Any
 
+from ..provenance import Origin, origin_of
 from ..utils import tilde_home_dir
 from ..vers_check import VersionCheck
 from .config import RunCmdConfig
@@ -29,6 +31,7 @@ class EmbeddedScripts:
         vers_class: VersionCheck,
         use_embedded_scripts: bool,
         plugin_handler: str,
+        bash: str = "",
     ) -> None:
         conf_file = tilde_home_dir(conf_file)
         if conf_file[0] not in ("~", "/"):
@@ -40,6 +43,7 @@ class EmbeddedScripts:
             use_embedded=use_embedded_scripts,
             plugin_handler=plugin_handler,
             vers=vers_class,
+            bash=bash,
         )
         self.registry = ScriptRegistry()
 
@@ -60,7 +64,13 @@ class EmbeddedScripts:
             # barks at incompatible bashisms in the manual plugin handled
             use_bash = True
 
-        spec = ScriptSpec(scr_name, script_lines, use_bash, built_in)
+        spec = ScriptSpec(
+            scr_name,
+            script_lines,
+            use_bash,
+            built_in,
+            origin_of(sys._getframe(1)),  # pylint: disable=W0212
+        )
 
         if not self.registry.accept(spec):
             return
@@ -78,6 +88,6 @@ class EmbeddedScripts:
             return self._emitter.external_path(ScriptSpec(scr_name, [], False, False))
         return scr_name
 
-    def generate_embedded_scripts_content(self) -> list[str]:
-        """generate content"""
+    def generate_embedded_scripts_content(self) -> list[tuple[str, Origin | None]]:
+        """generate content, each line with the origin of its script"""
         return self._emitter.embedded_block()
@@ -11,6 +11,8 @@ Dataclass defining a script
 
 from dataclasses import dataclass
 
+from ..provenance import Origin
+
 
 @dataclass(frozen=True)
 class ScriptSpec:
@@ -22,3 +24,4 @@ class ScriptSpec:
     lines: list[str]
     use_bash: bool
     built_in: bool
+    origin: Origin | None = None  # where it was created, for the source map
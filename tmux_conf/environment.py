@@ -0,0 +1,122 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Snapshot of the environment a config is generated for
+
+Everything a config depends on, beyond its source code, is collected in
+a snapshot: the env variables listed in TmuxConfig.fingerprint_env, the
+results of all probes, the tmux binary and what version it reports.
+
+Saving a snapshot (--env-dump) and generating from it (--env-load) gives
+the same config as generating in the environment it was taken in, even
+on another host. It also makes benchmarks independent of the
+environment they run in.
+
+HOME is recorded but by default not applied when loading, the local HOME
+is still where files are written. When generating a config for another
+host, to be written somewhere else (--output), HOME is also applied, so
+that paths in the config refer to the destination host.
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+SNAPSHOT_VERSION = 1
+
+#  Recorded but not applied, see module docstring
+NOT_APPLIED_ENV = ("HOME",)
+
+
+@dataclass(frozen=True)
+class EnvSnapshot:
+    """What a config was, or will be, generated from"""
+
+    env: Mapping[str, str | None]  # None if not set
+    probes: Mapping[str, Any]
+    tmux_bin: str
+    tmux_reported: str  # output of tmux -V
+    source_file: str  # the profile
+    created_on: str = ""  # hostname, purely informational
+    conf_file: str = ""  # where the config is used, full path
+
+    @classmethod
+    def capture(
+        cls,
+        env_names: tuple[str, ...],
+        probes: Mapping[str, Any],
+        tmux_bin: str,
+        tmux_reported: str,
+        source_file: str,
+        created_on: str = "",
+        conf_file: str = "",
+    ) -> "EnvSnapshot":
+        """Snapshot of the current environment"""
+        return cls(
+            env={name: os.environ.get(name) for name in sorted(set(env_names))},
+            probes=dict(probes),
+            tmux_bin=tmux_bin,
+            tmux_reported=tmux_reported,
+            source_file=source_file,
+            created_on=created_on,
+            conf_file=conf_file,
+        )
+
+    @classmethod
+    def load(cls, f_name: str) -> "EnvSnapshot":
+        """Raises OSError if f_name can't be read and ValueError if it is
+        not a snapshot of a supported version.
+        """
+        with open(os.path.expanduser(f_name), encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{f_name} is not a valid snapshot: {exc}") from exc
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{f_name} - unsupported snapshot version")
+        try:
+            return cls(
+                env=data["env"],
+                probes=data["probes"],
+                tmux_bin=data["tmux"]["bin"],
+                tmux_reported=data["tmux"]["reported"],
+                source_file=data["source_file"],
+                created_on=data.get("created_on", ""),
+                conf_file=data.get("conf_file", ""),
+            )
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"{f_name} - missing item: {exc}") from exc
+
+    def save(self, f_name: str) -> None:
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "created_on": self.created_on,
+            "source_file": self.source_file,
+            "conf_file": self.conf_file,
+            "tmux": {"bin": self.tmux_bin, "reported": self.tmux_reported},
+            "env": dict(self.env),
+            "probes": dict(self.probes),
+        }
+        with open(os.path.expanduser(f_name), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    def apply_env(self, include_home: bool = False) -> None:
+        """Make os.environ match the snapshot, for the recorded names"""
+        for name, value in self.env.items():
+            if name in NOT_APPLIED_ENV and not include_home:
+                continue
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
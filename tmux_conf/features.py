@@ -0,0 +1,56 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Named tmux features, and the first version supporting them
+
+Checked with has(), instead of vers_ok() with a version number, this
+makes it clear what the check is for. Add features here when needed.
+
+FEATURE_PROBES lists how to detect a feature in the binary, used when
+use_feature_probe is set, see capabilities.py for the syntax.
+"""
+
+from types import MappingProxyType
+
+FEATURES = MappingProxyType(
+    {
+        "styles": "1.9",  # *-style options, like status-style
+        "mouse_option": "2.1",  # a single mouse option, not mode-mouse etc
+        "full_size_split": "2.3",  # split-window -f
+        "pane_border_status": "2.4",
+        "tmux_256color": "2.9",  # tmux-256color as default-terminal
+        "hook_arrays": "3.0",  # set-hook name[idx]
+        "bind_notes": "3.1",  # bind -N
+        "popup": "3.2",  # display-popup
+        "extended_keys": "3.2",
+        "if_shell_format_conditions": "3.2",  # complex if-shell -F conditions
+        "popup_title": "3.3",  # display-popup -T and popup-border-lines
+        "pane_border_indicators": "3.3",
+        "allow_set_title": "3.5",
+        "floating_pane": "3.7",  # new-pane
+    }
+)
+
+FEATURE_PROBES = MappingProxyType(
+    {
+        "styles": "opt:status-style",
+        "mouse_option": "opt:mouse",
+        "full_size_split": "cmd:split-window:f",
+        "pane_border_status": "opt:pane-border-status",
+        "bind_notes": "cmd:bind-key:N",
+        "popup": "cmd:display-popup",
+        "extended_keys": "opt:extended-keys",
+        "popup_title": "cmd:display-popup:T",
+        "pane_border_indicators": "opt:pane-border-indicators",
+        "allow_set_title": "opt:allow-set-title",
+        "floating_pane": "cmd:new-pane",
+    }
+)
@@ -0,0 +1,72 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Fingerprint of the inputs a config was generated from
+
+If the fingerprint of the current inputs matches the one stored in the
+meta file of an existing config, generating it again would give the same
+result, so that step can be skipped. See read_conf_header().
+"""
+
+import hashlib
+import os
+import sys
+
+_LIB_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+def profile_source_files(cls: type) -> list[str]:
+    """Source files of all classes in the MRO of cls
+
+    This package is excluded, see lib_source_files()
+    """
+    files: list[str] = []
+    for c in cls.__mro__:
+        module = sys.modules.get(c.__module__)
+        f_name = getattr(module, "__file__", None)
+        if not f_name:
+            continue  # builtins
+        f_name = os.path.realpath(f_name)
+        if f_name.startswith(_LIB_DIR + os.sep) or f_name in files:
+            continue
+        files.append(f_name)
+    return files
+
+
+def lib_source_files() -> list[str]:
+    """Source files of this package
+
+    The lib version is not bumped for each change, so the sources are
+    needed to notice them. All are used, not only the loaded modules, since
+    some are imported on first use. Empty when run from a bundle, it is
+    fingerprinted as a whole.
+    """
+    files: list[str] = []
+    for d_name, d_names, f_names in os.walk(_LIB_DIR):
+        d_names[:] = sorted(d for d in d_names if d != "__pycache__")
+        files += [os.path.join(d_name, f) for f in sorted(f_names) if f.endswith(".py")]
+    return files
+
+
+def calculate_fingerprint(files: list[str], values: dict[str, str]) -> str:
+    """Hash of the content of files and the given values"""
+    h = hashlib.sha256()
+    for f_name in files:
+        h.update(f"{f_name}\0".encode())
+        try:
+            with open(f_name, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"<missing>")
+        h.update(b"\0")
+    for key in sorted(values):
+        h.update(f"{key}={values[key]}\0".encode())
+    return h.hexdigest()
@@ -0,0 +1,345 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Import time of a profile, attributed to own modules and the stdlib
+
+    ./sb/sb_local.py --profile-imports
+    python3 -m tmux_conf.import_profile [--json] PROFILE
+
+The profile is loaded, without being run, in a fresh interpreter using
+python -X importtime. Each import is attributed to the module importing
+it, and classified as own, stdlib or other (installed packages).
+
+Imports of own modules, that bind names only used inside functions, are
+listed as possible to defer. Such imports could be done on first use.
+"""
+
+import ast
+import json
+import os
+import sys
+import zipfile
+from dataclasses import dataclass, field
+
+from .processes import run_cmd_result
+from .zipapp import bundle_file, module_name, profile_source, script_name
+
+ORIGIN_OWN = "own"
+ORIGIN_STDLIB = "stdlib"
+ORIGIN_OTHER = "other"
+
+#  What the profile imports is reported as imported by this
+PROFILE = "<profile>"
+
+#  Seconds, loading a profile can be slow on limited hosts
+LOAD_TIMEOUT = 60.0
+
+#  Written to stderr just before the profile is loaded, imports before it
+#  are done by the interpreter itself
+_START_MARKER = "import-profile-start"
+
+#  Loads the profile, then lists file and package status of all modules
+_LOADER = f"""
+import json, pkgutil, runpy, sys  # pkgutil is used by runpy
+bundle, profile = sys.argv[1:3]
+sys.argv = [profile]
+sys.stderr.write("{_START_MARKER}\\n")
+sys.stderr.flush()
+if bundle:
+    sys.path.insert(0, bundle)
+    runpy.run_module(profile, run_name="__profile_imports__")
+else:
+    runpy.run_path(profile, run_name="__profile_imports__")
+modules = {{
+    name: [getattr(m, "__file__", None) or "", hasattr(m, "__path__")]
+    for name, m in list(sys.modules.items())
+}}
+print(json.dumps(modules))
+"""
+
+
+@dataclass
+class ImportRecord:
+    """One line of python -X importtime output, times in us"""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    imported_by: str = PROFILE
+    origin: str = ORIGIN_OTHER
+    f_name: str = ""
+    is_package: bool = False
+
+
+@dataclass
+class ImportProfile:
+    """All imports done when loading a profile"""
+
+    profile: str
+    records: list[ImportRecord]
+    #  module -> own modules importing it, only using it inside functions
+    deferrable: dict[str, list[str]] = field(default_factory=dict)
+
+    def total_us(self) -> int:
+        return sum(r.cumulative_us for r in self.records if r.depth == 0)
+
+    def self_us_by_origin(self) -> dict[str, int]:
+        totals = dict.fromkeys((ORIGIN_OWN, ORIGIN_STDLIB, ORIGIN_OTHER), 0)
+        for r in self.records:
+            totals[r.origin] += r.self_us
+        return totals
+
+    def own_modules(self) -> list[ImportRecord]:
+        records = [r for r in self.records if r.origin == ORIGIN_OWN]
+        return sorted(records, key=lambda r: -r.cumulative_us)
+
+    def external_imports(self) -> list[ImportRecord]:
+        """Not own modules, imported directly by an own module"""
+        own = {r.name for r in self.records if r.origin == ORIGIN_OWN} | {PROFILE}
+        records = [
+            r for r in self.records if r.origin != ORIGIN_OWN and r.imported_by in own
+        ]
+        return sorted(records, key=lambda r: -r.cumulative_us)
+
+    def deferrable_imports(self) -> list[ImportRecord]:
+        records = [r for r in self.records if r.name in self.deferrable]
+        return sorted(records, key=lambda r: -r.cumulative_us)
+
+    def table(self) -> str:
+        """Human readable report"""
+        by_origin = self.self_us_by_origin()
+        lines = [
+            f"Import time for: {self.profile}",
+            f"total {self.total_us() / 1000:.2f} ms - "
+            + ", ".join(f"{k} {v / 1000:.2f} ms" for k, v in by_origin.items()),
+            "",
+            f"{'Own modules':<36} {'self ms':>9} {'cumul ms':>9}",
+        ]
+        for r in self.own_modules():
+            lines.append(
+                f"  {r.name:<34} {r.self_us / 1000:9.2f} {r.cumulative_us / 1000:9.2f}"
+            )
+        lines += ["", f"{'Imported from own modules':<36} {'cumul ms':>9}  imported by"]
+        for r in self.external_imports():
+            lines.append(
+                f"  {r.name:<34} {r.cumulative_us / 1000:9.2f}  {r.imported_by}"
+            )
+        lines += ["", "Could be deferred, only used inside functions by:"]
+        for r in self.deferrable_imports():
+            users = ", ".join(self.deferrable[r.name])
+            lines.append(f"  {r.name:<34} {r.cumulative_us / 1000:9.2f}  {users}")
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict[str, object]:
+        """Data suitable for json, all times are in ms"""
+        return {
+            "profile": self.profile,
+            "total_ms": self.total_us() / 1000,
+            "self_ms_by_origin": {
+                k: v / 1000 for k, v in self.self_us_by_origin().items()
+            },
+            "modules": [
+                {
+                    "name": r.name,
+                    "origin": r.origin,
+                    "imported_by": r.imported_by,
+                    "self_ms": r.self_us / 1000,
+                    "cumulative_ms": r.cumulative_us / 1000,
+                }
+                for r in self.records
+            ],
+            "deferrable": self.deferrable,
+        }
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Records from python -X importtime output, lines after the start
+    marker are used if present. A module is listed after the modules it
+    imports, one indent level deeper.
+    """
+    lines = output.splitlines()
+    if _START_MARKER in lines:
+        lines = lines[lines.index(_START_MARKER) + 1 :]
+    records: list[ImportRecord] = []
+    pending: dict[int, list[ImportRecord]] = {}
+    for line in lines:
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name_col = parts[2][1:]
+        name = name_col.strip()
+        depth = (len(name_col) - len(name_col.lstrip())) // 2
+        record = ImportRecord(name, int(parts[0]), int(parts[1]), depth)
+        for child in pending.pop(depth + 1, []):
+            child.imported_by = name
+        pending.setdefault(depth, []).append(record)
+        records.append(record)
+    return records
+
+
+def module_origin(name: str, f_name: str) -> str:
+    if name.partition(".")[0] in sys.stdlib_module_names:
+        return ORIGIN_STDLIB
+    if not f_name or "site-packages" in f_name or "dist-packages" in f_name:
+        return ORIGIN_OTHER
+    return ORIGIN_OWN
+
+
+def top_level_imports(tree: ast.Module, package: str) -> dict[str, list[str]]:
+    """Names bound by imports done when the module is loaded, and the
+    modules they could come from, the most specific first.
+    """
+    bound: dict[str, list[str]] = {}
+    nodes: list[ast.stmt] = list(tree.body)
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    bound[alias.asname] = [alias.name]
+                else:
+                    bound[alias.name.partition(".")[0]] = [alias.name]
+        elif isinstance(node, ast.ImportFrom) and node.module != "__future__":
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".")[: len(package.split(".")) - node.level + 1]
+                base = ".".join(parts + ([base] if base else []))
+            for alias in node.names:
+                bound[alias.asname or alias.name] = [f"{base}.{alias.name}", base]
+        elif isinstance(node, ast.If) and "TYPE_CHECKING" in ast.unparse(node.test):
+            continue  # not imported at run time
+        elif isinstance(node, (ast.If, ast.Try, ast.With)):
+            nodes += [n for n in ast.iter_child_nodes(node) if isinstance(n, ast.stmt)]
+    return bound
+
+
+def names_used_on_load(tree: ast.Module) -> set[str]:
+    """Names used when the module is loaded, anything outside function
+    bodies, including decorators, defaults and annotations.
+    """
+    used: set[str] = set()
+    nodes: list[ast.AST] = [tree]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            nodes += node.decorator_list + node.args.defaults
+            nodes += [d for d in node.args.kw_defaults if d]
+            nodes += [
+                a.annotation
+                for a in ast.walk(node.args)
+                if isinstance(a, ast.arg) and a.annotation
+            ]
+            if node.returns:
+                nodes.append(node.returns)
+        elif isinstance(node, ast.Lambda):
+            continue
+        elif isinstance(node, ast.Name):
+            used.add(node.id)
+        else:
+            nodes += ast.iter_child_nodes(node)
+    return used
+
+
+def module_source(record: ImportRecord, bundle: str) -> str:
+    try:
+        if bundle and record.f_name.startswith(bundle + os.sep):
+            with zipfile.ZipFile(bundle) as zf:
+                return zf.read(script_name(record.f_name)).decode()
+        with open(record.f_name, encoding="utf-8") as f:
+            return f.read()
+    except (KeyError, OSError, UnicodeDecodeError):
+        return ""
+
+
+def find_deferrable(
+    records: list[ImportRecord], profile: str, bundle: str
+) -> dict[str, list[str]]:
+    """Modules only imported by own modules not needing them when loaded,
+    imports in a package __init__ are assumed to be needed, as re-exports.
+    """
+    own = [r for r in records if r.origin == ORIGIN_OWN]
+    profile_record = ImportRecord(PROFILE, 0, 0, -1, f_name=profile)
+    loaded = {r.name for r in records}
+    #  module -> [importers using it only in functions, importers needing it]
+    importers: dict[str, tuple[list[str], list[str]]] = {}
+    for record in own + [profile_record]:
+        try:
+            tree = ast.parse(module_source(record, bundle))
+        except SyntaxError:
+            continue
+        if record.is_package:
+            package = record.name
+        else:
+            package = record.name.rpartition(".")[0]
+        used = names_used_on_load(tree)
+        for bound_name, candidates in top_level_imports(tree, package).items():
+            module = next((m for m in candidates if m in loaded), "")
+            if module:
+                needed = bound_name in used or record.is_package
+                importers.setdefault(module, ([], []))[needed].append(record.name)
+    return {
+        module: sorted(set(lazy))
+        for module, (lazy, needed) in importers.items()
+        if lazy and not needed
+    }
+
+
+def profile_imports(f_name: str) -> ImportProfile:
+    """Load profile f_name in a fresh interpreter, and profile its imports"""
+    bundle = bundle_file()
+    if bundle and f_name.startswith(bundle + os.sep):
+        target = module_name(script_name(f_name))
+    else:
+        bundle, target = "", f_name
+    result = run_cmd_result(
+        [sys.executable, "-X", "importtime", "-c", _LOADER, bundle, target],
+        timeout=LOAD_TIMEOUT,
+    )
+    records = parse_importtime(result.stderr)
+    if result.timed_out:
+        raise RuntimeError(f"Timed out loading {f_name}")
+    if result.returncode or not records:
+        raise RuntimeError(f"Failed to load {f_name}:\n{result.stderr[-2000:]}")
+    modules = json.loads(result.stdout.splitlines()[-1])
+    for r in records:
+        r.f_name, r.is_package = modules.get(r.name, ("", False))
+        r.origin = module_origin(r.name, r.f_name)
+    deferrable = find_deferrable(records, f_name, bundle)
+    return ImportProfile(profile_source(f_name), records, deferrable)
+
+
+def report(f_name: str, fmt: str) -> int:
+    """Print the import profile of f_name, fmt is "table" or "json" """
+    try:
+        result = profile_imports(f_name)
+    except RuntimeError as exc:
+        print(f"ERROR: {exc}")
+        return 1
+    if fmt == "json":
+        print(json.dumps(result.as_dict(), indent=2))
+    else:
+        print(result.table())
+    return 0
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    fmt = "json" if "--json" in args else "table"
+    args = [a for a in args if a != "--json"]
+    if len(args) != 1:
+        print("Usage: python3 -m tmux_conf.import_profile [--json] PROFILE")
+        return 1
+    return report(os.path.abspath(args[0]), fmt)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
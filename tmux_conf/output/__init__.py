@@ -0,0 +1,35 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/my_tmux_conf
+#
+
+"""Output package for tmux-conf.
+
+This package streams what is written through a pipeline of line stages,
+collects the generated config in memory and writes it to disk in one go
+once the config is complete.
+"""
+
+from .engine import OutputEngine
+from .pipeline import (
+    BacktickStage,
+    LineStage,
+    NoteStage,
+    TrimStage,
+    WriteCmd,
+    WritePipeline,
+)
+from .stats import WriteStats
+
+__all__ = [
+    "BacktickStage",
+    "LineStage",
+    "NoteStage",
+    "OutputEngine",
+    "TrimStage",
+    "WriteCmd",
+    "WritePipeline",
+    "WriteStats",
+]
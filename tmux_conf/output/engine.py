@@ -0,0 +1,218 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/my_tmux_conf
+#
+
+"""
+Buffers the generated config in memory, and writes it in one go
+"""
+
+import contextlib
+import json
+import os
+import stat
+from typing import TYPE_CHECKING
+
+from ..provenance import Origin
+from .stats import WriteStats
+
+if TYPE_CHECKING:
+    from ..source_map import SourceMapBuilder
+
+#  Modules only needed when reading or writing files are imported where used,
+#  so importing a profile stays quick
+# pylint: disable=import-outside-toplevel
+
+
+class OutputEngine:
+    """Collects all lines of the config, nothing touches the file system
+    until flush() is called.
+
+    Lines are expected to already have been validated by
+    TmuxConfig.write(), the complete config is encoded before the file
+    is opened, so an encoding error will not leave a truncated config behind.
+
+    If atomic is True, the config is written to a temp file in the same
+    folder, synced to disk and then renamed into place. A tmux sourcing
+    the config at the same time will thus either see the previous or the
+    new config, never a partial one.
+
+    If conf_file already has the exact same content, it is left untouched,
+    so that its mtime only changes when the config does. Data that
+    changes on each write, such as when it was written, or the fingerprint
+    of what it was generated from, is kept in the sidecar file meta_file()
+    instead of in the config itself.
+
+    If source_map is True, the origin given for each line is saved in
+    the sidecar file map_file(), see source_map.py
+    """
+
+    def __init__(self, conf_file: str, atomic: bool = True, source_map: bool = False):
+        self._conf_file = conf_file
+        self._atomic = atomic
+        self._chunks: list[str] = []
+        self._source_map: SourceMapBuilder | None = None
+        if source_map:
+            from .. import source_map as sm
+
+            self._source_map = sm.SourceMapBuilder()
+
+    def add(self, line: str, eol: str = "\n", origin: Origin | None = None) -> None:
+        """Append a line to the buffer"""
+        self._chunks.append(f"{line}{eol}")
+        if self._source_map:
+            self._source_map.add(origin, eol)
+
+    def clear(self) -> None:
+        """Drop anything buffered so far"""
+        self._chunks = []
+        if self._source_map:
+            self._source_map.clear()
+
+    def content(self) -> str:
+        """The config as it will be written"""
+        return "".join(self._chunks)
+
+    def meta_file(self) -> str:
+        """Sidecar file with info about when the config was written"""
+        from ..conf_header import meta_file_for
+
+        return meta_file_for(self._conf_file)
+
+    def map_file(self) -> str:
+        """Sidecar file mapping lines of the config to the code writing them"""
+        from ..source_map import map_file_for
+
+        return map_file_for(self._conf_file)
+
+    def read_meta(self) -> dict[str, str]:
+        """Items in meta_file(), empty if it could not be read"""
+        from ..conf_header import read_meta
+
+        return read_meta(self._conf_file)
+
+    def matches_meta(self, meta: dict[str, str]) -> bool:
+        """True if conf_file is still what was written along with meta"""
+        return bool(meta.get("sha256")) and meta["sha256"] == self._current_digest()
+
+    def flush(self, meta_items: dict[str, str] | None = None) -> WriteStats:
+        """Write the buffered config to conf_file, replacing any previous
+        content, unless that content is identical.
+
+        meta_items are saved in meta_file(), it is updated if they changed,
+        even if the config did not.
+        """
+        import hashlib
+
+        meta_items = meta_items or {}
+        data = self.content().encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        changed = digest != self._current_digest(len(data))
+        if changed:
+            self._write(self._conf_file, data)
+            self._write_meta(digest, meta_items)
+        else:
+            meta = self.read_meta()
+            if any(meta.get(k) != v for k, v in meta_items.items()):
+                self._write_meta(digest, meta_items, meta.get("created", ""))
+        if self._source_map:
+            self._write_if_changed(self.map_file(), self._source_map.to_json(digest))
+        stats = WriteStats(
+            conf_file=self._conf_file,
+            lines=data.count(b"\n"),
+            size=len(data),
+            changed=changed,
+        )
+        self.clear()
+        return stats
+
+    def _current_digest(self, size: int = -1) -> str:
+        """Hash of the existing conf_file, if size is given it is only
+        calculated if the size matches, otherwise it can't be identical anyhow.
+        """
+        import hashlib
+
+        try:
+            if size > -1 and os.stat(self._conf_file).st_size != size:
+                return ""
+            with open(self._conf_file, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return ""
+
+    def _write_meta(
+        self, digest: str, meta_items: dict[str, str], created: str = ""
+    ) -> None:
+        import datetime
+
+        meta = {
+            "created": created or datetime.datetime.now().strftime("%F %T"),
+            "sha256": digest,
+            **meta_items,
+        }
+        self._write(self.meta_file(), (json.dumps(meta, indent=2) + "\n").encode())
+
+    def _write_if_changed(self, f_name: str, data: bytes) -> None:
+        """The map changes if the code does, even if the config does not"""
+        try:
+            with open(f_name, "rb") as f:
+                if f.read() == data:
+                    return
+        except OSError:
+            pass
+        self._write(f_name, data)
+
+    def _write(self, f_name: str, data: bytes) -> None:
+        if self._atomic:
+            self._write_atomic(f_name, data)
+        else:
+            with open(f_name, "wb") as f:
+                f.write(data)
+
+    def _write_atomic(self, f_name: str, data: bytes) -> None:
+        #  If f_name is a symlink, replace what it points to, not the link
+        import tempfile
+
+        target = os.path.realpath(f_name)
+        folder, name = os.path.split(target)
+        fd, tmp_file = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_file, self._file_mode(target))
+            os.replace(tmp_file, target)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_file)
+            raise
+        self._sync_folder(folder)
+
+    @staticmethod
+    def _file_mode(target: str) -> int:
+        """mkstemp() creates files as 0600, keep the mode of the config
+        being replaced, or use what umask gives for a new file.
+        """
+        try:
+            return stat.S_IMODE(os.stat(target).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    @staticmethod
+    def _sync_folder(folder: str) -> None:
+        """Ensure the rename itself is on disk, not supported everywhere"""
+        try:
+            fd = os.open(folder, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -0,0 +1,120 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/my_tmux_conf
+#
+
+"""
+The steps a write() goes through before reaching the output buffer
+
+Lines are streamed through a chain of generators, one line at a time:
+
+    split -> trim -> notes -> back-ticks -> [added stages] -> sink
+
+Additional passes, such as minification or option de-duplication can be
+added using WritePipeline.add_stage()
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+
+from ..tokenizer import btick_unescaped
+
+# What TmuxConfig.write() accepts
+WriteCmd = str | list[str] | list[list[str]]
+
+
+def split_lines(cmd: WriteCmd) -> Iterator[str]:
+    """Yields each line of cmd, lists are flattened and multi-line strings
+    are split on LF.
+    """
+    pending: list[Iterator[WriteCmd]] = [iter((cmd,))]
+    while pending:
+        item = next(pending[-1], None)
+        if item is None:
+            pending.pop()
+        elif isinstance(item, list):
+            pending.append(iter(item))
+        else:
+            start = 0
+            end = item.find("\n")
+            while end > -1:
+                yield item[start:end]
+                start = end + 1
+                end = item.find("\n", start)
+            yield item[start:]
+
+
+class LineStage:  # pylint: disable=too-few-public-methods
+    """A step in the write pipeline, receives the lines from the previous
+    stage and yields lines for the next. A stage can drop, alter or
+    insert lines.
+    """
+
+    def process(self, lines: Iterable[str], trim_ws: bool) -> Iterator[str]:
+        """trim_ws is the param given to TmuxConfig.write()"""
+        raise NotImplementedError("process() must be defined in sub-class!")
+
+
+class TrimStage(LineStage):  # pylint: disable=too-few-public-methods
+    """Removes indentation and trailing white-space"""
+
+    def process(self, lines: Iterable[str], trim_ws: bool) -> Iterator[str]:
+        if not trim_ws:
+            yield from lines
+            return
+        for line in lines:
+            yield line.strip()
+
+
+class NoteStage(LineStage):  # pylint: disable=too-few-public-methods
+    """Handles bind -N notes, using TmuxConfig.filter_note()"""
+
+    def __init__(self, filter_note: Callable[..., list[str]]) -> None:
+        self._filter_note = filter_note
+
+    def process(self, lines: Iterable[str], trim_ws: bool) -> Iterator[str]:
+        for line in lines:
+            if line.find("bind -N") > -1:
+                yield from self._filter_note(line, trim_ws=trim_ws)
+            else:
+                yield line
+
+
+class BacktickStage(LineStage):  # pylint: disable=too-few-public-methods
+    """Embedded scripts are run by the shell from the config file, an
+    un-escaped back-tick would be evaluated when that happens.
+    """
+
+    def process(self, lines: Iterable[str], trim_ws: bool) -> Iterator[str]:
+        for line in lines:
+            if btick_unescaped(line):
+                raise SyntaxError(
+                    "Un-escaped back-ticks can not be present in "
+                    + "the generated config when\n"
+                    + "embedded_scripts are used!"
+                )
+            yield line
+
+
+class WritePipeline:
+    """Feeds what is given to write() through all stages, and hands the
+    resulting lines to sink.
+    """
+
+    def __init__(self, stages: list[LineStage], sink: Callable[[str, str], None]):
+        self._stages = stages
+        self._sink = sink
+
+    def add_stage(self, stage: LineStage) -> None:
+        """Add a stage, it will process lines after the current stages"""
+        self._stages.append(stage)
+
+    def run(self, cmd: WriteCmd, trim_ws: bool = True, eol: str = "\n") -> None:
+        """Process cmd through all stages"""
+        lines: Iterable[str] = split_lines(cmd)
+        for stage in self._stages:
+            lines = stage.process(lines, trim_ws)
+        sink = self._sink
+        for line in lines:
+            sink(line, eol)
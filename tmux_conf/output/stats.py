@@ -0,0 +1,29 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/my_tmux_conf
+#
+
+"""
+Dataclass reporting what was written to the config file
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WriteStats:
+    """Summary of a flush of the output buffer"""
+
+    conf_file: str
+    lines: int
+    size: int  # in bytes, as encoded on disk
+    changed: bool = True  # False if conf_file already had this content
+
+    def __str__(self) -> str:
+        if not self.changed:
+            return (
+                f"unchanged, {self.lines} lines ({self.size} bytes) in {self.conf_file}"
+            )
+        return f"{self.lines} lines ({self.size} bytes) written to {self.conf_file}"
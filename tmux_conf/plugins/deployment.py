@@ -10,11 +10,11 @@
 """Plugin deployment handling for tmux plugins"""
 
 import os
-from collections.abc import Callable
 
 from ..embeded_scripts import EmbeddedScripts
+from ..provenance import Origin
 from ..vers_check import VersionCheck
-from .registry import PLUGIN_MTHD, PLUGIN_STATIC_CODE, PluginRegistry
+from .registry import PluginRegistry, PluginSpec
 
 
 class PluginDeployment:
@@ -39,8 +39,9 @@ class PluginDeployment:
         self._fnc_activate_tpm = "activate_tpm"
         self._fnc_activate_manually = "activate_plugins_manually"
 
-    def parse(self) -> list[str]:
-        """Generate plugin references and configuration.
+    def parse(self) -> list[tuple[str, Origin | None]]:
+        """Generate plugin references and configuration, each line along
+        with the origin of the plugin method defining it.
 
         This method will use any plugin defining methods it can find.
         They will be sorted alphabetically by method name, normally the order
@@ -57,44 +58,44 @@ class PluginDeployment:
         The code snippet will just be copied as is, so if a version or other
         check is needed, put that code before the return. Within the method
         all normal tmux-conf functionality is available.
+
+        The methods were called during scan, here only their PluginSpec is
+        used. An optional fourth item, a setup callable, is called here.
         """
-        used_plugins: dict[str, tuple[str, Callable[[], list[str]], str]] = (
-            self._registry.get_used_plugins()
-        )
+        used_plugins: dict[str, PluginSpec] = self._registry.get_used_plugins()
         if not used_plugins:
             return []
 
-        output = []
+        output: list[tuple[str, Origin | None]] = []
         vers: VersionCheck = self._registry.get_version_checker()
 
         #
-        #  First ensure that plugin code that needs to process the
-        #  environment is done and output is written to config.
+        #  Setup phase, plugins that need to process the environment
+        #  get to do it now, and any output is written to config.
         #
-        for _, info in used_plugins.items():
-            plugin_method = info[PLUGIN_MTHD]
-            plugin_method()  # type: ignore[operator]
+        for spec in used_plugins.values():
+            spec.run_setup()
 
-        # Callable[[], list[str]]
+        #
         #  Add plugin references and hard coded plugin settings.
         #
-        for name, info in used_plugins.items():
-            output.append("#------------------------------")
+        for name, spec in used_plugins.items():
+            lines = ["#------------------------------"]
             if vers.is_ok("1.8"):
-                output.append(f'set -g @plugin "{name}"')
-                static_code = info[PLUGIN_STATIC_CODE]
-                for line in static_code.split("\n"):  # type: ignore[union-attr]
-                    output.append(line.strip())
+                lines.append(f'set -g @plugin "{name}"')
+                for line in spec.code.split("\n"):
+                    lines.append(line.strip())
             else:
                 #  prior to 1.8, any variables starting with @ would get tmux
                 #  stuck parsing the config file, so plugins without any such
                 #  setting could be handled by activate_plugins_manually()
                 #  This is such a rare edge case that it is not worth handling
-                output += [
+                lines += [
                     f"# plugin: {name}",
                     "# in versions < 1.8 @variables can not be used",
                     "",
                 ]
+            output += [(line, spec.origin) for line in lines]
 
         return output
 
@@ -13,12 +13,10 @@
 
 import os
 import sys
-from collections.abc import Callable
-
-import __main__
 
 from ..vers_check import VersionCheck
-from .registry import PLUGIN_VERS_MIN, PluginRegistry
+from ..zipapp import main_profile_source
+from .registry import PluginRegistry, PluginSpec
 
 
 # pylint: disable=too-few-public-methods
@@ -39,9 +37,7 @@ class PluginDisplay:
 
     def display_info(self) -> None:
         """List selected and ignored plugins, depending on param"""
-        used_plugins: dict[str, tuple[str, Callable[[], list[str]], str]] = (
-            self._registry.get_used_plugins()
-        )
+        used_plugins: dict[str, PluginSpec] = self._registry.get_used_plugins()
 
         skipped_plugins: list[tuple[str, str]] = self._registry.get_skipped_plugins()
         self._print_header()
@@ -60,11 +56,9 @@ class PluginDisplay:
         """Print the header with tmux version information."""
         vers: VersionCheck = self._registry.get_version_checker()
         print(f"\n\t=====  tmux {vers.get()} - Plugins defined  =====")
-        print(f" for: {__main__.__file__}")
+        print(f" for: {main_profile_source()}")
 
-    def _calculate_max_name_length(
-        self, used_plugins: dict[str, tuple[str, Callable[[], list[str]], str]]
-    ) -> int:
+    def _calculate_max_name_length(self, used_plugins: dict[str, PluginSpec]) -> int:
         """Calculate the maximum plugin name length for formatting."""
         if not used_plugins:
             return 0
@@ -83,7 +77,7 @@ class PluginDisplay:
 
     def _display_used_plugins(
         self,
-        used_plugins: dict[str, tuple[str, Callable[[], list[str]], str]],
+        used_plugins: dict[str, PluginSpec],
         plugin_items: list[str],
         max_l_name: int,
     ) -> None:
@@ -95,18 +89,16 @@ class PluginDisplay:
         print(f"{'Plugin':<{max_l_name}}|  Min version")
 
         verbose = self._plugins_display == 3
-        name: str
-        info: tuple[str, Callable[[], list[str]], str]
-        for name, info in used_plugins.items():
+        for name, spec in used_plugins.items():
             if verbose:
-                self._display_plugin_verbose(name, info, plugin_items, max_l_name)
+                self._display_plugin_verbose(name, spec, plugin_items, max_l_name)
             else:
-                self._display_plugin_brief(name, info, plugin_items, max_l_name)
+                self._display_plugin_brief(name, spec, plugin_items, max_l_name)
 
     def _display_plugin_verbose(
         self,
         name: str,
-        info: tuple[str, Callable[[], list[str]], str],
+        spec: PluginSpec,
         plugin_items: list[str],
         max_l_name: int,
     ) -> None:
@@ -116,18 +108,16 @@ class PluginDisplay:
             plugin_items, inner_name, " *** Not installed ***"
         )
         print("".ljust(len(inner_name) + 2, "-"))
-        print(f"> {inner_name:<{max_l_name - 2}} - {info[PLUGIN_VERS_MIN]} {suffix}")
-        # print(f"><> {type(info[PLUGIN_MTHD])}")
-        # sys.exit(1)
-        info[1]()  # Execute plugin method for verbose output
+        print(f"> {inner_name:<{max_l_name - 2}} - {spec.vers_min} {suffix}")
+        spec.run_setup()  # for verbose output
         # Skip indentation, for easier read
-        for line in info[2].split("\n"):
+        for line in spec.code.split("\n"):
             print(f"{line.strip()}")
 
     def _display_plugin_brief(
         self,
         name: str,
-        info: tuple[str, Callable[[], list[str]], str],
+        spec: PluginSpec,
         plugin_items: list[str],
         max_l_name: int,
     ) -> None:
@@ -136,7 +126,7 @@ class PluginDisplay:
         suffix = self._remove_if_found(
             plugin_items, inner_name, " *** Not installed ***"
         )
-        print(f"{inner_name:<{max_l_name}} - {info[PLUGIN_VERS_MIN]} {suffix}")
+        print(f"{inner_name:<{max_l_name}} - {spec.vers_min} {suffix}")
 
     def _display_unused_plugins(
         self, plugin_items: list[str], skipped_plugins: list[tuple[str, str]]
@@ -19,6 +19,7 @@ from collections.abc import Callable
 from dataclasses import dataclass
 
 from ..embeded_scripts import EmbeddedScripts
+from ..provenance import Origin
 from ..vers_check import VersionCheck
 from .deployment import PluginDeployment
 from .display import PluginDisplay
@@ -137,8 +138,9 @@ class Plugins:
         """List selected and ignored plugins, depending on param"""
         self._display.display_info()
 
-    def parse(self) -> list[str]:
-        """Generate plugin references and configuration."""
+    def parse(self) -> list[tuple[str, Origin | None]]:
+        """Generate plugin references and configuration, with the origin
+        of each line."""
         return self._deployment.parse()
 
     def deploy_plugin_handler(self) -> list[str]:
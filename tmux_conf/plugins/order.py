@@ -0,0 +1,91 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Order of plugin methods, resolved once per class
+
+Plugins are defined in method name order, unless a method is decorated
+with plugin_order(), saying what plugins it must come after:
+
+    @plugin_order(after=("plugin_resurrect",), last=True)
+    def plugin_continuum(self) -> list:
+
+last=True puts it after all plugins not also marked last, like themes
+that might overwrite status-right.
+"""
+
+import heapq
+from collections.abc import Callable
+from typing import Any
+
+PLUGIN_PREFIX = "plugin_"
+
+#  Attributes set by plugin_order() on the method
+_AFTER_ATTR = "_plugin_after"
+_LAST_ATTR = "_plugin_last"
+
+
+def plugin_order(
+    after: tuple[str, ...] = (), last: bool = False
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """after is names of plugin methods, that this one must follow"""
+
+    def decorator(mthd: Callable[..., Any]) -> Callable[..., Any]:
+        setattr(mthd, _AFTER_ATTR, tuple(after))
+        setattr(mthd, _LAST_ATTR, last)
+        return mthd
+
+    return decorator
+
+
+def plugin_methods(cls: type) -> dict[str, Callable[..., Any]]:
+    """All plugin_... methods of cls, including inherited ones"""
+    methods: dict[str, Callable[..., Any]] = {}
+    for klass in reversed(cls.__mro__):
+        for name, item in vars(klass).items():
+            if name.startswith(PLUGIN_PREFIX):
+                if callable(item):
+                    methods[name] = item
+                else:
+                    methods.pop(name, None)  # overridden by a non method
+    return methods
+
+
+def resolve_order(methods: dict[str, Callable[..., Any]]) -> tuple[str, ...]:
+    """Method names sorted so all constraints are met, otherwise by name"""
+    last = {name for name, m in methods.items() if getattr(m, _LAST_ATTR, False)}
+    preceding: dict[str, set[str]] = {name: set() for name in methods}
+    for name, mthd in methods.items():
+        #  Constraints referring to absent plugins are ignored
+        preceding[name].update(
+            a for a in getattr(mthd, _AFTER_ATTR, ()) if a in methods
+        )
+        if name in last:
+            preceding[name].update(set(methods) - last)
+
+    following: dict[str, list[str]] = {name: [] for name in methods}
+    for name, before in preceding.items():
+        for b in before:
+            following[b].append(name)
+    waiting = {name: len(before) for name, before in preceding.items()}
+    ready = [name for name, count in waiting.items() if not count]
+    heapq.heapify(ready)
+    order: list[str] = []
+    while ready:
+        name = heapq.heappop(ready)
+        order.append(name)
+        for f in following[name]:
+            waiting[f] -= 1
+            if not waiting[f]:
+                heapq.heappush(ready, f)
+    if len(order) < len(methods):
+        cycle = sorted(set(methods) - set(order))
+        raise ValueError(f"Circular plugin order between: {', '.join(cycle)}")
+    return tuple(order)
@@ -14,13 +14,34 @@
 import os
 import sys
 from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
 
 from ..constants import XDG_CONFIG_HOME
+from ..provenance import Origin, origin_of_function
 from ..vers_check import VersionCheck
 
-PLUGIN_VERS_MIN = 0
-PLUGIN_MTHD = 1
-PLUGIN_STATIC_CODE = 2
+
+@dataclass(frozen=True)
+class PluginSpec:
+    """Result of a plugin_... method, it is only called once, during scan.
+
+    Anything a plugin needs to do beyond returning its code, like writing
+    to the config, should be done by the optional setup callable, a fourth
+    item in what the method returns. It is called once, in the setup
+    phase of parse().
+    """
+
+    name: str
+    vers_min: str  # -1 means skip it entirely
+    code: str
+    method: str  # name of the plugin_... method
+    setup: Callable[[], None] | None = None
+    origin: Origin | None = None  # of the method, for the source map
+
+    def run_setup(self) -> None:
+        if self.setup is not None:
+            self.setup()
 
 
 class PluginRegistry:
@@ -42,36 +63,49 @@ class PluginRegistry:
         self._vers: VersionCheck = vers_class
 
         # plugins compatible with this version
-        self._used_plugins: dict[str, tuple[str, Callable[[], list[str]], str]] = {}
+        self._used_plugins: dict[str, PluginSpec] = {}
 
         # plugins incompatible with this version
         self._skipped_plugins: list[tuple[str, str]] = []
 
+        # plugin dir and tpm env, only depends on conf_file
+        self._env: tuple[str, str] | None = None
+
+    @staticmethod
+    def evaluate(plugin_mthd: Callable[[], list[Any]]) -> PluginSpec:
+        """Call a plugin method, and store what it returned"""
+        plugin_name, vers_min, code, *extra = plugin_mthd()
+        return PluginSpec(
+            name=plugin_name,
+            #  Since plugin method might define vers_min as a float or int
+            #  it needs to be converted to a string for plugin handling
+            vers_min=str(vers_min),
+            code=code,
+            method=getattr(plugin_mthd, "__name__", ""),
+            setup=extra[0] if extra else None,
+            origin=origin_of_function(plugin_mthd),
+        )
+
     def scan(self, plugin_methods: list[Callable[[], list[str]]]) -> None:
         """Investigate all defined plugin methods, and determine if a
         given plugin can be used depending on running tmux, or if it should be skipped
         """
         duplicate_check = []
         for plugin_mthd in plugin_methods:
-            plugin_name, vers_min, code = plugin_mthd()
-            if plugin_name in duplicate_check:
-                print(f'ERROR: plugin "{plugin_name}" defined more than once:')
+            spec = self.evaluate(plugin_mthd)
+            if spec.name in duplicate_check:
+                print(
+                    f'ERROR: plugin "{spec.name}" defined more than once: {spec.method}'
+                )
                 sys.exit(1)
             else:
-                duplicate_check.append(plugin_name)
-            #  Since plugin method might define vers_min as a float or int
-            #  it needs to be converted to a string for plugin handling
-            s_vers_min = str(vers_min)
-            if s_vers_min in ("-1", "-1.0"):
+                duplicate_check.append(spec.name)
+            if spec.vers_min in ("-1", "-1.0"):
                 continue  # skip it entirely
-            if self._vers.is_ok(s_vers_min):
-                self._used_plugins[plugin_name] = (
-                    s_vers_min,  # PLUGIN_VERS_MIN
-                    plugin_mthd,  # PLUGIN_MTHD
-                    code,  # PLUGIN_STATIC_CODE
-                )
+            if self._vers.is_ok(spec.vers_min):
+                self._used_plugins[spec.name] = spec
             else:
-                self._skipped_plugins.append((s_vers_min, plugin_name))
+                self._skipped_plugins.append((spec.vers_min, spec.name))
         self._skipped_plugins.sort()
 
     def installed(self, short_name: bool = True) -> list[str]:
@@ -103,6 +137,11 @@ class PluginRegistry:
 
     def get_env(self) -> tuple[str, str]:
         """Get plugin directory and TPM environment."""
+        if self._env is None:
+            self._env = self._find_env()
+        return self._env
+
+    def _find_env(self) -> tuple[str, str]:
         location = os.path.dirname(os.path.expanduser(self._conf_file))
         if location == os.path.expanduser("~"):
             #
@@ -126,7 +165,7 @@ class PluginRegistry:
 
         return plugins_dir, tpm_env
 
-    def get_used_plugins(self) -> dict[str, tuple[str, Callable[[], list[str]], str]]:
+    def get_used_plugins(self) -> dict[str, PluginSpec]:
         """Returns the dict of used plugins."""
         return self._used_plugins
 
@@ -0,0 +1,134 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Probing the environment
+
+All probes are declared up front by TmuxConfig.declare_probes(), run,
+and collected into a read-only snapshot that the rest of the generation
+uses.
+
+Most probes take microseconds, and are just run one after the other.
+Probes marked with blocking(), that wait on a process or the network,
+are started in a thread each, so they overlap with examining the tmux bin,
+instead of adding to it.
+
+A probe is a callable without params, it should only depend on the
+environment, not on the state of the config being generated.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from types import MappingProxyType
+from typing import Any
+
+Probes = dict[str, Callable[[], Any]]
+
+_BLOCKING_ATTR = "_probe_blocks"
+
+
+def blocking(probe: Callable[[], Any]) -> Callable[[], Any]:
+    """Mark probe as waiting on something, so it is run in a thread"""
+
+    def run() -> Any:
+        return probe()
+
+    setattr(run, _BLOCKING_ATTR, True)
+    return run
+
+
+class ProbeSnapshot(Mapping[str, Any]):
+    """Read-only results of all probes, durations are in seconds"""
+
+    def __init__(
+        self,
+        results: dict[str, Any],
+        durations: dict[str, float],
+        threaded: frozenset[str] = frozenset(),
+    ):
+        self._results = MappingProxyType(results)
+        self.durations = MappingProxyType(durations)
+        self.threaded = threaded
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._results[name]
+        except KeyError:
+            raise KeyError(f"No probe named: {name} - see declare_probes()") from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._results)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def table(self) -> str:
+        """Human readable report"""
+        lines = [f"Probes run: {len(self)}, in threads: {len(self.threaded)}"]
+        for name, duration in self.durations.items():
+            suffix = "  (thread)" if name in self.threaded else ""
+            lines.append(f"  {duration * 1000:9.2f} ms  {name}{suffix}")
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict[str, object]:
+        """Data suitable for json, all times are in ms"""
+        return {name: round(d * 1000, 3) for name, d in self.durations.items()}
+
+
+class ProbeRun:
+    """Probes are run when created, blocking ones in the background,
+    snapshot() waits for them.
+
+    Probes found in known are not run, the given result is used,
+    this is how a loaded environment snapshot is used.
+    """
+
+    def __init__(self, probes: Probes, known: Mapping[str, Any] | None = None):
+        self._known = {name: known[name] for name in probes if known and name in known}
+        self._results: dict[str, tuple[Any, float]] = {}
+        self._errors: dict[str, BaseException] = {}
+        self._threads: dict[str, threading.Thread] = {}
+        for name, probe in probes.items():
+            if name in self._known:
+                continue
+            if getattr(probe, _BLOCKING_ATTR, False):
+                thread = threading.Thread(
+                    target=self._run, args=(name, probe), name=f"probe-{name}"
+                )
+                thread.start()
+                self._threads[name] = thread
+            else:
+                self._results[name] = _timed(probe)
+
+    def _run(self, name: str, probe: Callable[[], Any]) -> None:
+        try:
+            self._results[name] = _timed(probe)
+        except BaseException as exc:  # noqa: BLE001 - raised again in snapshot()
+            self._errors[name] = exc
+
+    def snapshot(self) -> ProbeSnapshot:
+        """Wait for all probes, any exception in a probe is raised here"""
+        for thread in self._threads.values():
+            thread.join()
+        for exc in self._errors.values():
+            raise exc
+        results: dict[str, Any] = dict(self._known)
+        durations: dict[str, float] = dict.fromkeys(self._known, 0.0)
+        for name, (result, duration) in self._results.items():
+            results[name] = result
+            durations[name] = duration
+        return ProbeSnapshot(results, durations, frozenset(self._threads))
+
+
+def _timed(probe: Callable[[], Any]) -> tuple[Any, float]:
+    t_start = time.perf_counter()
+    result = probe()
+    return result, time.perf_counter() - t_start
@@ -0,0 +1,197 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""All external commands are run from here
+
+Commands are given as argv lists and run without a shell, each with a
+timeout. Every call is recorded, so a report can list how many processes
+a generation run started, what they were and how long they took.
+
+Prefer Python alternatives when possible, each process started is
+noticeable on slow hosts, such as iSH.
+"""
+
+import subprocess  # nosec B404
+import sys
+import time
+from dataclasses import dataclass
+from types import FrameType
+
+DEFAULT_TIMEOUT = 10.0  # seconds
+
+#  Wrappers, the caller of these is what gets recorded
+_WRAPPERS = ("run_cmd", "run_cmd_result", "run_shell", "spawn_cmd")
+
+
+@dataclass(frozen=True)
+class ProcessCall:
+    """A recorded call, duration is in seconds"""
+
+    argv: tuple[str, ...]
+    caller: str
+    returncode: int  # -1 if it could not be started or timed out
+    duration: float
+    timed_out: bool = False
+    detached: bool = False  # left running in the background
+
+
+@dataclass(frozen=True)
+class CmdResult:
+    """Output of a command, as given by ProcessRunner.run_result()"""
+
+    stdout: str
+    stderr: str
+    returncode: int  # -1 if it could not be started or timed out
+    timed_out: bool = False
+
+
+class ProcessRunner:
+    """Runs commands and keeps a record of each call"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.timeout = timeout
+        self.calls: list[ProcessCall] = []
+
+    def run(self, argv: list[str], timeout: float | None = None) -> str:
+        """Returns stdout stripped of surrounding white-space,
+        or "" if the command failed to start or timed out.
+        """
+        caller = _caller(sys._getframe(1))  # pylint: disable=protected-access
+        return self._run(argv, timeout, caller).stdout.strip()
+
+    def run_result(self, argv: list[str], timeout: float | None = None) -> CmdResult:
+        """As run(), for when stderr or the exit code is also needed"""
+        caller = _caller(sys._getframe(1))  # pylint: disable=protected-access
+        return self._run(argv, timeout, caller)
+
+    def _run(self, argv: list[str], timeout: float | None, caller: str) -> CmdResult:
+        t_start = time.perf_counter()
+        try:
+            # pylint: disable=subprocess-run-check
+            completed = subprocess.run(  # nosec B603
+                argv,
+                capture_output=True,
+                text=True,
+                timeout=timeout or self.timeout,
+            )
+            result = CmdResult(completed.stdout, completed.stderr, completed.returncode)
+        except subprocess.TimeoutExpired:
+            result = CmdResult("", "", returncode=-1, timed_out=True)
+        except OSError as exc:  # not found or not executable
+            result = CmdResult("", str(exc), returncode=-1)
+        self.calls.append(
+            ProcessCall(
+                argv=tuple(argv),
+                caller=caller,
+                returncode=result.returncode,
+                duration=time.perf_counter() - t_start,
+                timed_out=result.timed_out,
+            )
+        )
+        return result
+
+    def spawn(self, argv: list[str]) -> bool:
+        """Start argv in the background, detached from this process,
+        it keeps running after this process has exited.
+        Returns False if it could not be started.
+        """
+        caller = _caller(sys._getframe(1))  # pylint: disable=protected-access
+        t_start = time.perf_counter()
+        started = True
+        try:
+            # pylint: disable=consider-using-with
+            subprocess.Popen(  # nosec B603
+                argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            started = False
+        self.calls.append(
+            ProcessCall(
+                argv=tuple(argv),
+                caller=caller,
+                returncode=0 if started else -1,
+                duration=time.perf_counter() - t_start,
+                detached=True,
+            )
+        )
+        return started
+
+    def total(self) -> float:
+        """Seconds spent in external commands"""
+        return sum(c.duration for c in self.calls)
+
+    def table(self) -> str:
+        """Human readable report"""
+        lines = [
+            f"Processes started: {len(self.calls)} "
+            + f"- total: {self.total() * 1000:.2f} ms"
+        ]
+        for c in self.calls:
+            if c.timed_out:
+                status = "timeout"
+            elif c.detached:
+                status = "bg"
+            else:
+                status = f"rc={c.returncode}"
+            lines.append(
+                f"  {c.duration * 1000:9.2f} ms  {status:<7}  "
+                + f"{' '.join(c.argv)}  [{c.caller}]"
+            )
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict[str, object]:
+        """Data suitable for json, all times are in ms"""
+        return {
+            "count": len(self.calls),
+            "total_ms": round(self.total() * 1000, 3),
+            "calls": [
+                {
+                    "argv": list(c.argv),
+                    "caller": c.caller,
+                    "returncode": c.returncode,
+                    "timed_out": c.timed_out,
+                    "detached": c.detached,
+                    "duration_ms": round(c.duration * 1000, 3),
+                }
+                for c in self.calls
+            ],
+        }
+
+
+def _caller(frame: FrameType | None) -> str:
+    while frame is not None and frame.f_code.co_name in _WRAPPERS:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return frame.f_code.co_qualname
+
+
+#  Shared by everything running in this process
+PROCESSES = ProcessRunner()
+
+
+def run_cmd(argv: list[str], timeout: float | None = None) -> str:
+    """Run argv using the shared ProcessRunner, see ProcessRunner.run()"""
+    return PROCESSES.run(argv, timeout)
+
+
+def run_cmd_result(argv: list[str], timeout: float | None = None) -> CmdResult:
+    """Run argv using the shared ProcessRunner, see ProcessRunner.run_result()"""
+    return PROCESSES.run_result(argv, timeout)
+
+
+def spawn_cmd(argv: list[str]) -> bool:
+    """Start argv in the background, see ProcessRunner.spawn()"""
+    return PROCESSES.spawn(argv)
@@ -0,0 +1,45 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Identifies what code generated a given part of the config"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import FrameType
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Origin:
+    """Where a write() was called from"""
+
+    qualname: str  # Class.method
+    file_name: str
+    line_no: int
+
+    def __str__(self) -> str:
+        return f"{self.qualname} ({self.file_name}:{self.line_no})"
+
+
+def origin_of(frame: FrameType | None) -> Origin:
+    """Origin of the code running in frame"""
+    if frame is None:
+        return Origin("?", "?", 0)
+    code = frame.f_code
+    return Origin(code.co_qualname, code.co_filename, frame.f_lineno)
+
+
+def origin_of_function(func: Callable[..., Any]) -> Origin | None:
+    """Origin of the definition of func, None if it is not python code"""
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return None
+    return Origin(code.co_qualname, code.co_filename, code.co_firstlineno)
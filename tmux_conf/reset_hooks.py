@@ -0,0 +1,34 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Forgetting state between runs in the same process
+
+When profiles are run repeatedly by the generator daemon, values that
+modules computed from the environment of a previous run must not be
+used. Such modules register a hook, called before each run.
+
+Kept separate from daemon.py, so registering is free of import cost.
+"""
+
+from collections.abc import Callable
+
+_HOOKS: list[Callable[[], None]] = []
+
+
+def on_reset(hook: Callable[[], None]) -> None:
+    """Call hook before each run in the daemon"""
+    if hook not in _HOOKS:
+        _HOOKS.append(hook)
+
+
+def reset_all() -> None:
+    for hook in _HOOKS:
+        hook()
@@ -0,0 +1,206 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Maps lines of a generated config back to the code that wrote them
+
+When a config is written, a sidecar file <conf_file>.map is saved,
+listing ranges of lines, and the method and source line that wrote them.
+
+When tmux complains about a given line in the config, the code behind it
+can be found without having to regenerate it, or even load the profile:
+
+    python3 -m tmux_conf.source_map --where 1234 [conf_file]
+
+This module only depends on the standard library, so that the lookup
+is quick.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+
+from .provenance import Origin
+
+MAP_VERSION = 1
+MAP_SUFFIX = ".map"
+
+#  Index of each item in a range
+RANGE_START = 0
+RANGE_END = 1
+RANGE_QUALNAME = 2
+RANGE_FILE = 3
+RANGE_LINE = 4
+
+
+def map_file_for(conf_file: str) -> str:
+    """Name of the source map belonging to conf_file"""
+    return f"{conf_file}{MAP_SUFFIX}"
+
+
+class SourceMapBuilder:
+    """Collects the origin of each line as the config is written.
+
+    Consecutive lines written by the same write() are stored as a
+    single range, the typical config ends up with a few hundred ranges.
+    """
+
+    def __init__(self) -> None:
+        self._line_no = 1
+        self._ranges: list[list[str | int]] = []
+        self._files: dict[str, int] = {}
+        self._prev: Origin | None = None
+
+    def clear(self) -> None:
+        """Drop anything recorded so far"""
+        self._line_no = 1
+        self._ranges = []
+        self._files = {}
+        self._prev = None
+
+    def add(self, origin: Origin | None, eol: str) -> None:
+        """Record origin for the current line, eol is the line ending used,
+        it decides if the next add() refers to the same or a later line.
+        """
+        if origin is not None:
+            last = self._ranges[-1] if self._ranges else None
+            if (
+                last is not None
+                and origin == self._prev
+                and last[RANGE_END] in (self._line_no, self._line_no - 1)
+            ):
+                last[RANGE_END] = self._line_no
+            else:
+                file_idx = self._files.setdefault(origin.file_name, len(self._files))
+                self._ranges.append(
+                    [
+                        self._line_no,
+                        self._line_no,
+                        origin.qualname,
+                        file_idx,
+                        origin.line_no,
+                    ]
+                )
+            self._prev = origin
+        self._line_no += eol.count("\n")
+
+    def to_json(self, conf_sha256: str) -> bytes:
+        """Content of the map file, conf_sha256 identifies what version of
+        the config it belongs to.
+        """
+        data = {
+            "version": MAP_VERSION,
+            "sha256": conf_sha256,
+            "files": list(self._files),
+            "ranges": self._ranges,
+        }
+        return (json.dumps(data, separators=(",", ":")) + "\n").encode()
+
+
+@dataclass(frozen=True)
+class SourceMap:
+    """A loaded map file"""
+
+    sha256: str
+    files: tuple[str, ...]
+    ranges: tuple[tuple[int, int, str, int, int], ...]
+
+    @classmethod
+    def load(cls, map_file: str) -> "SourceMap":
+        """Raises OSError if the map can't be read and ValueError if it
+        is not in the expected format.
+        """
+        with open(map_file, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MAP_VERSION:
+            raise ValueError(f"{map_file} - unsupported version: {data.get('version')}")
+        return cls(
+            sha256=data["sha256"],
+            files=tuple(data["files"]),
+            ranges=tuple(tuple(r) for r in data["ranges"]),  # type: ignore[misc]
+        )
+
+    def where(self, line_no: int) -> Origin | None:
+        """Origin of line_no in the config, None if not known"""
+        idx = bisect.bisect_right(self.ranges, (line_no, sys.maxsize)) - 1
+        if idx < 0:
+            return None
+        start, end, qualname, file_idx, src_line = self.ranges[idx]
+        if not start <= line_no <= end:
+            return None
+        return Origin(qualname, self.files[file_idx], src_line)
+
+    def matches(self, conf_file: str) -> bool:
+        """Returns False if conf_file has changed since the map was saved"""
+        try:
+            with open(conf_file, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest() == self.sha256
+        except OSError:
+            return False
+
+
+def conf_line(conf_file: str, line_no: int) -> str:
+    """The given line of conf_file, "" if not present"""
+    try:
+        with open(conf_file, encoding="utf-8", errors="replace") as f:
+            for i, line in enumerate(f, start=1):
+                if i == line_no:
+                    return line.rstrip("\n")
+    except OSError:
+        pass
+    return ""
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line lookup of what generated a line in a config"""
+    parser = argparse.ArgumentParser(
+        prog="python3 -m tmux_conf.source_map",
+        description="Displays what code generated a line in a tmux config",
+    )
+    parser.add_argument(
+        "-w", "--where", type=int, required=True, metavar="LINE", help="Line to look up"
+    )
+    parser.add_argument(
+        "conf_file",
+        nargs="?",
+        default="~/.tmux.conf",
+        help="Generated config, default: %(default)s",
+    )
+    args = parser.parse_args(argv)
+
+    conf_file = os.path.expanduser(args.conf_file)
+    map_file = map_file_for(conf_file)
+    try:
+        source_map = SourceMap.load(map_file)
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"ERROR: Failed to load source map: {exc}", file=sys.stderr)
+        return 1
+    if not source_map.matches(conf_file):
+        print(
+            f"WARNING: {conf_file} has changed since {map_file} was written",
+            file=sys.stderr,
+        )
+
+    origin = source_map.where(args.where)
+    if origin is None:
+        print(f"ERROR: No origin known for line {args.where}", file=sys.stderr)
+        return 1
+    print(f"{conf_file}:{args.where}: {conf_line(conf_file, args.where)}")
+    print(f"    {origin.qualname}")
+    print(f"    {origin.file_name}:{origin.line_no}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Time spent in each phase of generating a config
+
+Phases can be nested, the report lists them in the order they started,
+indented by nesting level.
+"""
+
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class Phase:
+    """A timed step, duration is in seconds"""
+
+    name: str
+    depth: int
+    start: float  # relative to when timing started
+    duration: float = 0.0
+
+
+class Timings:
+    """Collects the duration of named phases"""
+
+    def __init__(self) -> None:
+        self._t_start = time.perf_counter()
+        self._depth = 0
+        self.phases: list[Phase] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the code run inside this context"""
+        t_start = time.perf_counter()
+        item = Phase(name=name, depth=self._depth, start=t_start - self._t_start)
+        self.phases.append(item)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            item.duration = time.perf_counter() - t_start
+
+    def total(self) -> float:
+        """Seconds since timing started"""
+        return time.perf_counter() - self._t_start
+
+    def table(self) -> str:
+        """Human readable report"""
+        total = self.total()
+        width = max([len(p.name) + 2 * p.depth for p in self.phases] + [5])
+        lines = [f"{'Phase':<{width}}  {'ms':>9}  {'%':>5}"]
+        for p in self.phases:
+            label = "  " * p.depth + p.name
+            pct = 100 * p.duration / total if total else 0
+            lines.append(f"{label:<{width}}  {p.duration * 1000:9.2f}  {pct:5.1f}")
+        lines.append(f"{'total':<{width}}  {total * 1000:9.2f}  {100:5.1f}")
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict[str, object]:
+        """Data suitable for json, all times are in ms"""
+        return {
+            "total_ms": round(self.total() * 1000, 3),
+            "phases": [
+                {
+                    "name": p.name,
+                    "depth": p.depth,
+                    "start_ms": round(p.start * 1000, 3),
+                    "duration_ms": round(p.duration * 1000, 3),
+                }
+                for p in self.phases
+            ],
+        }
+
+    def to_json(self, **sections: object) -> str:
+        """as_dict() as json, with sections added as extra items"""
+        return json.dumps({**self.as_dict(), **sections}, indent=2)
@@ -15,22 +15,49 @@
 
 """Class that generates a .tmux.conf"""
 
-# from datetime import datetime
-import datetime
 import os
 import shutil
 import sys
 from pathlib import Path
-from typing import Any
-
-import __main__
+from typing import TYPE_CHECKING, Any
 
 from .constants import __version__
 from .embeded_scripts import EmbeddedScripts
 from .exceptions import TmuxConfNotTmuxCommand
+from .features import FEATURES
+from .output import (
+    BacktickStage,
+    LineStage,
+    NoteStage,
+    OutputEngine,
+    TrimStage,
+    WriteCmd,
+    WritePipeline,
+)
 from .plugins import Plugins
-from .utils import btick_unescaped, parse_cmdline, run_shell, verify_conf_file_usable
+from .plugins.order import plugin_methods, resolve_order
+from .probes import ProbeRun, Probes, ProbeSnapshot
+from .processes import PROCESSES, run_cmd
+from .provenance import Origin, origin_of
+from .timings import Timings
+from .tokenizer import tokenize
+from .utils import expanduser_plus, parse_cmdline, verify_conf_file_usable
 from .vers_check import VersionCheck
+from .zipapp import bundle_file, main_profile_source
+
+#  Only needed for some runs, or late in a run, so they are imported
+#  where used, keeping the startup of every profile quick
+# pylint: disable=import-outside-toplevel
+if TYPE_CHECKING:
+    from .bin_cache import BinaryCache, BinaryId
+    from .debug_log import DebugLog
+    from .environment import EnvSnapshot
+
+
+def _hostname() -> str:
+    import socket
+
+    return socket.gethostname()
 
 
 # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-public-methods
@@ -65,6 +92,14 @@ class TmuxConfig:
     #
     use_embedded_scripts: bool = True
 
+    #
+    #  If true the config is written to a temp file that is then renamed
+    #  into place. This way a tmux sourcing the config while it is being
+    #  generated will never see a half written file.
+    #  Set to false to write directly into the config file.
+    #
+    use_atomic_write: bool = True
+
     #
     #  Indicates if this host is low on performance, don't enable
     #  demanding plugins etc, I use this on my iSH nodes.
@@ -82,7 +117,54 @@ class TmuxConfig:
 
     lib_version: str = __version__
 
-    use_debug_log = False  # if True, debug log will be printed
+    #
+    #  If True, a JSON-lines debug log is saved in ~/tmux_conf-dbg.log
+    #  listing each line written, what method wrote it and what
+    #  vers_ok() checks were done before it.
+    #
+    use_debug_log = False
+
+    #
+    #  If True, <conf_file>.map is saved, listing what method wrote each
+    #  line of the config. Use this to look up the origin of a line:
+    #    python3 -m tmux_conf.source_map --where LINE [conf_file]
+    #
+    use_source_map = True
+
+    #
+    #  If True, the version reported by a tmux binary is cached in
+    #  ~/.cache/tmux_conf, so that it is only run when it has changed.
+    #
+    use_bin_cache = True
+
+    #
+    #  If True, the tmux binary is asked what commands, options and hooks
+    #  it supports, and has() uses that for the features in features.py
+    #  that can be probed. Dev builds get the version their features match.
+    #  Results are kept in the binary cache, so this is only done once.
+    #
+    use_feature_probe = False
+
+    #
+    #  Env variables that the config depends on, a change in any of them
+    #  changes the fingerprint, and thereby triggers a regeneration.
+    #  Sub-classes should extend this with what they use.
+    #
+    fingerprint_env: tuple[str, ...] = ("HOME", "XDG_CONFIG_HOME")
+
+    #
+    #  Env variables where only being set or not matters to the config,
+    #  their values are not part of the fingerprint.
+    #
+    fingerprint_env_presence: tuple[str, ...] = ()
+
+    #  Names of the plugin_... methods in the order they are defined,
+    #  resolved when a sub-class is created, see plugins/order.py
+    _plugin_order: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._plugin_order = resolve_order(plugin_methods(cls))
 
     # pylint: disable=too-many-arguments,too-many-positional-arguments
     def __init__(
@@ -98,22 +180,65 @@ class TmuxConfig:
         clear_plugins: bool = False,  # remove all current plugins
         plugins_display: int = 0,  # Display info about plugins
         # then terminate
+        force_regenerate: bool = False,  # ignore matching fingerprint
+        timings: str = "",  # report time per phase, "table" or "json"
+        env_dump: str = "",  # save environment snapshot here, then terminate
+        env_load: str = "",  # generate from this environment snapshot
+        output: str = "",  # write here, conf_file is then where it will be used
     ):
+        #  Always collected, only displayed if timings is requested
+        self.timings = Timings()
         if parse_cmd_line:
-            args = parse_cmdline(sys.argv[1:])
+            with self.timings.phase("parse_cmdline"):
+                args = parse_cmdline(sys.argv[1:])
+            if args.profile_imports:
+                #  The profile is loaded again in a fresh interpreter
+                # pylint: disable-next=import-outside-toplevel
+                from .import_profile import report
+
+                f_name = os.path.abspath(sys.modules["__main__"].__file__ or "")
+                sys.exit(report(f_name, args.profile_imports))
             conf_file = args.conf_file
             tmux_bin = args.tmux_bin
             tmux_version = args.forced_version
             replace_config = args.replace
             clear_plugins = args.clear_plugins
             plugins_display = args.plugins_display
+            force_regenerate = args.force
+            timings = args.timings
+            env_dump = args.env_dump
+            env_load = args.env_load
+            output = args.output
+        self.timings_format = timings
+        self.env_dump = env_dump
 
-        print(f"Processing: {__main__.__file__}")
+        #
+        #  A loaded snapshot replaces the live environment, so it must be
+        #  applied before anything reads env variables
+        #
+        self.env_snapshot: EnvSnapshot | None = None
+        if env_load:
+            #  With output, the config is for the host the snapshot was
+            #  taken on, so its HOME and conf_file are used
+            self.env_snapshot = self.load_env_snapshot(
+                env_load, include_home=bool(output)
+            )
+            tmux_bin = self.env_snapshot.tmux_bin
+            if output and self.env_snapshot.conf_file:
+                conf_file = self.env_snapshot.conf_file
+            self.source_file = self.env_snapshot.source_file
+        else:
+            #  Looked up now, the daemon runs profiles as a temporary __main__
+            self.source_file = main_profile_source()
+
+        print(f"Processing: {self.source_file}")
         self.tmux_bin = ""
         self.e_c_has_been_called = False
-        self._parsing_note = False  # Only enabled during parsing of bind note
         # config file will only be written to if self.write_enable(True) has been set
         self._write_enabled = False
+        #  Code behind the line being written, for the debug log & source map
+        self._write_origin: Origin | None = None
+        self._debug: DebugLog | None = None
         self.init_debug_log()
 
         #  can't use self.is_tmate() at this point, since self.tmux_bin
@@ -131,9 +256,34 @@ class TmuxConfig:
                 #  tmate only supports manual plugin handling
                 self.plugin_handler = "manual"
 
-        self.conf_file = verify_conf_file_usable(conf_file)
+        if output:
+            self.conf_file = expanduser_plus(conf_file)
+            self.output_file = verify_conf_file_usable(output)
+            if not self.use_embedded_scripts:
+                print("ERROR: output can only be used with use_embedded_scripts")
+                sys.exit(1)
+        else:
+            self.conf_file = verify_conf_file_usable(conf_file)
+            self.output_file = self.conf_file
+        #  Generated config is buffered, and written once run() is done
+        self.output = OutputEngine(
+            self.output_file,
+            atomic=self.use_atomic_write,
+            source_map=self.use_source_map,
+        )
+        stages: list[LineStage] = [TrimStage(), NoteStage(self.filter_note)]
+        if self.use_embedded_scripts:
+            stages.append(BacktickStage())
+        self.write_pipeline = WritePipeline(stages, sink=self._write_sink)
 
-        self.use_tmux_bin(tmux_bin, tmux_version)
+        #  Blocking probes run in the background, while the tmux bin is examined
+        probe_run = ProbeRun(
+            self.declare_probes(),
+            known=self.env_snapshot.probes if self.env_snapshot else None,
+        )
+        self.bin_cache: BinaryCache | None = None  # see binary_cache()
+        with self.timings.phase("use_tmux_bin"):
+            self.use_tmux_bin(tmux_bin, tmux_version)
         if tmux_version and (tmux_version != self.vers.get()):
             # self.define_tmux_vers(tmux_version)
             if not self.is_tmate():
@@ -155,13 +305,21 @@ class TmuxConfig:
                 print()
         self.replace_config = replace_config
         self.plugins_display = plugins_display
-
-        self.es = EmbeddedScripts(
-            conf_file=self.conf_file,
-            vers_class=self.vers,  # type: ignore
-            use_embedded_scripts=self.use_embedded_scripts,
-            plugin_handler=self.plugin_handler,
-        )
+        self.clear_plugins = clear_plugins
+        self.force_regenerate = force_regenerate
+        self.fingerprint = ""  # calculated in run()
+
+        with self.timings.phase("probes"):
+            self.probes: ProbeSnapshot = probe_run.snapshot()
+
+        with self.timings.phase("EmbeddedScripts"):
+            self.es = EmbeddedScripts(
+                conf_file=self.conf_file,
+                vers_class=self.vers,  # type: ignore
+                use_embedded_scripts=self.use_embedded_scripts,
+                plugin_handler=self.plugin_handler,
+                bash=self.probes["bash"],
+            )
 
         #
         #  If current tmux is too old to handle tpm plugins,
@@ -172,15 +330,17 @@ class TmuxConfig:
             # this is set to manual
             self.plugin_handler = "manual"
 
-        self.pre_plugin_checks()
-        self.plugins = Plugins(
-            conf_file=self.conf_file,
-            vers_class=self.vers,
-            es_class=self.es,
-            plugin_handler=self.plugin_handler,
-            clear_plugins=clear_plugins,
-            plugins_display=plugins_display,
-        )
+        with self.timings.phase("pre_plugin_checks"):
+            self.pre_plugin_checks()
+        with self.timings.phase("Plugins"):
+            self.plugins = Plugins(
+                conf_file=self.conf_file,
+                vers_class=self.vers,
+                es_class=self.es,
+                plugin_handler=self.plugin_handler,
+                clear_plugins=clear_plugins,
+                plugins_display=plugins_display,
+            )
 
     # ================================================================
     #
@@ -202,6 +362,56 @@ class TmuxConfig:
     #
     # ================================================================
 
+    def declare_probes(self) -> Probes:
+        """Environment probes, name: callable. They are run during
+        __init__(), their results are then available in self.probes
+        Wrap probes waiting on a process or the network in blocking().
+        Override to add probes, call super().declare_probes() to keep
+        the default items.
+        """
+        return {
+            "bash": lambda: shutil.which("bash") or "",
+            "hostname": _hostname,
+            "python3": lambda: shutil.which("python3") or "",
+        }
+
+    def fingerprint_files(self) -> list[str]:
+        """Files the generated config depends on.
+        By default this is the source of all classes in the inheritance
+        chain and this package. Override to add helper modules, call
+        super().fingerprint_files() to keep the default items.
+        """
+        from .fingerprint import lib_source_files, profile_source_files
+
+        files = profile_source_files(type(self)) + lib_source_files()
+        if bundle_file():
+            #  The files in it can't be read directly
+            files.append(bundle_file())
+        return files
+
+    def fingerprint_values(self) -> dict[str, str]:
+        """Non file inputs the generated config depends on.
+        Override to add items, call super().fingerprint_values() to keep
+        the default items.
+        """
+        values = {
+            "lib_version": self.lib_version,
+            "source": self.source_file,
+            "conf_file": self.conf_file,
+            "tmux_bin": self.tmux_bin,
+            "tmux_vers_reported": self.vers.get_reported(),
+            "tmux_vers": self.vers.get(),
+        }
+        if self.vers.capabilities:
+            values["tmux_features"] = repr(self.vers.features)
+        for env_name in self.fingerprint_env:
+            values[f"env:{env_name}"] = repr(os.environ.get(env_name))
+        for env_name in self.fingerprint_env_presence:
+            values[f"env_set:{env_name}"] = repr(bool(os.environ.get(env_name)))
+        for name, result in self.probes.items():
+            values[f"probe:{name}"] = repr(result)
+        return values
+
     def pre_plugin_checks(self) -> None:
         """
         Environment checks before plugin discovery.
@@ -281,7 +491,7 @@ class TmuxConfig:
         #  things will fail. If that turns out to be an issue, I guess
         #  storing the "right" python in the conf file would be a solution.
         #
-        py_bin = run_shell("command -v python3")
+        py_bin = self.probes["python3"]
 
         w(
             f'bind -N "Edit local config files"  {edit_key}  '
@@ -300,7 +510,17 @@ class TmuxConfig:
     #
     # ================================================================
     def vers_ok(self, vers: int | float | str) -> bool:
-        return self.vers.is_ok(vers)
+        result = self.vers.is_ok(vers)
+        if self._debug:
+            self._debug.vers_check(vers, result)
+        return result
+
+    def has(self, feature: str) -> bool:
+        """Checks if a named feature is available, see features.py"""
+        result = self.vers.has(feature)
+        if self._debug:
+            self._debug.vers_check(f"{feature}:{FEATURES[feature]}", result)
+        return result
 
     # ================================================================
     #
@@ -311,6 +531,21 @@ class TmuxConfig:
     def run(self) -> None:
         w = self.write
 
+        if self.env_dump:
+            self.save_env_snapshot(self.env_dump)
+            return
+
+        with self.timings.phase("fingerprint"):
+            from .fingerprint import calculate_fingerprint
+
+            self.fingerprint = calculate_fingerprint(
+                self.fingerprint_files(), self.fingerprint_values()
+            )
+        if self.conf_is_current():
+            print(f"Config is up to date, keeping: {self.output_file}")
+            self.report_timings()
+            return
+
         #
         #  Inform plugin handler if this is to be treated as a
         #  limited host, displaying progress as tpm is processed etc
@@ -321,7 +556,8 @@ class TmuxConfig:
             False
         )  # ensure config file is not written to during plugin scan
         if self.plugin_handler:
-            self.plugins.scan(self.list_plugin_methods())
+            with self.timings.phase("plugins.scan"):
+                self.plugins.scan(self.list_plugin_methods())
             if self.plugins_display == 3:
                 self.write_enable(True)
             if self.plugins_display:
@@ -332,12 +568,14 @@ class TmuxConfig:
 
         self.conf_file_header()
 
-        self.content()
+        with self.timings.phase("content"):
+            self.content()
         #
         #  check the edit_config() header in this class for hints on
         #  how to override the edit key
         #
-        self.edit_config()
+        with self.timings.phase("edit_config"):
+            self.edit_config()
         if self.plugin_handler and self.plugins.installed():
             w("""
             #======================================================
@@ -345,16 +583,19 @@ class TmuxConfig:
             #   Plugins
             #
             #======================================================\n""")
-            for line in self.plugins.parse():
-                self.write(line)
+            with self.timings.phase("plugins.parse"):
+                for line, origin in self.plugins.parse():
+                    self.write(line, origin=origin)
 
         #
         #  Local overrides should happen as late as possible, but still _before_
         #  tpm is triggered, to make sure overrides get processed.
         #
-        self.local_overrides()
+        with self.timings.phase("local_overrides"):
+            self.local_overrides()
 
-        self.write(self.plugins.deploy_plugin_handler())
+        with self.timings.phase("deploy_plugin_handler"):
+            self.write(self.plugins.deploy_plugin_handler())
         self.write()  # group spacer
 
         #
@@ -362,19 +603,88 @@ class TmuxConfig:
         #  gathered all the intended embedded scripts.
         #  If external scripts are used, his does nothing
         #
-        for line in self.es.generate_embedded_scripts_content():
-            self.write(line)
+        with self.timings.phase("embedded_scripts"):
+            for line, origin in self.es.generate_embedded_scripts_content():
+                self.write(line, origin=origin)
+
+        with self.timings.phase("flush"):
+            stats = self.output.flush({"fingerprint": self.fingerprint})
+        print(f"Config completed - {stats}")
+        if self._debug:
+            self._debug.close()
+        self.report_timings()
+
+    def load_env_snapshot(
+        self, f_name: str, include_home: bool = False
+    ) -> "EnvSnapshot":
+        """Load and apply an environment snapshot, terminates on failure"""
+        from .environment import EnvSnapshot
+
+        try:
+            snapshot = EnvSnapshot.load(f_name)
+        except (OSError, ValueError) as exc:
+            print(f"ERROR: Failed to load environment snapshot: {exc}")
+            sys.exit(1)
+        snapshot.apply_env(include_home=include_home)
+        print(f"Using environment snapshot: {f_name}")
+        print(f"  created on: {snapshot.created_on}")
+        return snapshot
+
+    def save_env_snapshot(self, f_name: str) -> None:
+        """Save what this config would be generated from"""
+        from .environment import EnvSnapshot
+
+        snapshot = EnvSnapshot.capture(
+            env_names=self.fingerprint_env + self.fingerprint_env_presence,
+            probes=self.probes,
+            tmux_bin=self.tmux_bin,
+            tmux_reported=self.tmux_reported,
+            source_file=self.source_file,
+            created_on=self.probes["hostname"],
+            conf_file=self.conf_file,
+        )
+        try:
+            snapshot.save(f_name)
+        except OSError as exc:
+            print(f"ERROR: Failed to save environment snapshot: {exc}")
+            sys.exit(1)
+        print(f"Environment snapshot saved to: {f_name}")
+
+    def report_timings(self) -> None:
+        """Display time used per phase, if requested"""
+        if self.timings_format == "json":
+            print(
+                self.timings.to_json(
+                    probes=self.probes.as_dict(), processes=PROCESSES.as_dict()
+                )
+            )
+        elif self.timings_format:
+            print()
+            print(self.timings.table())
+            print()
+            print(self.probes.table())
+            print()
+            print(PROCESSES.table())
+
+    def conf_is_current(self) -> bool:
+        """Returns True if the existing config was generated from identical
+        inputs, so there is no need to generate it again.
+        """
+        if self.force_regenerate or self.plugins_display or self.clear_plugins:
+            return False
+        from .conf_header import read_conf_header
+
+        header = read_conf_header(self.output_file)
+        if not header or header.fingerprint != self.fingerprint:
+            return False
+        return self.output.matches_meta(self.output.read_meta())
 
     def list_plugin_methods(self) -> list[Any]:
         # -> list[Callable[[], list[str]]]:
         """Support for plugins.py, provides a list of all plugin_... methods"""
-        plugin_mthds = []
-        if self.plugin_handler:
-            for item in dir(self):
-                if item.find("plugin_") or item == "plugin_handler":
-                    continue
-                plugin_mthds.append(getattr(self, item))
-        return plugin_mthds
+        if not self.plugin_handler:
+            return []
+        return [getattr(self, name) for name in self._plugin_order]
 
     # ===============================================================
     #
@@ -387,9 +697,10 @@ class TmuxConfig:
 
     def write(
         self,
-        cmd: str | list[str] | list[list[str]] = "",
+        cmd: WriteCmd = "",
         trim_ws: bool = True,  # trim leading white-space
         eol: str = "\n",
+        origin: Origin | None = None,
     ) -> None:
         """Writes tmux cmds to config file
 
@@ -397,62 +708,31 @@ class TmuxConfig:
         always be supplied, regardless of tmux version.
 
         Can handle single and multi line commands, prints LF as a suffix.
+
+        Each line is streamed through self.write_pipeline, more stages can
+        be added to it using self.write_pipeline.add_stage()
+        Lines are buffered by self.output, the config file is written
+        once run() has completed.
+
+        origin is what the debug log and source map attribute the lines to,
+        by default the caller of write().
         """
         if not self._write_enabled:
             #
             #  Plugin scans might trigger writes, at that point ignore them
             #
             return
-
-        if isinstance(cmd, list):
-            for line in cmd:
-                # self.debug_log(f"><> [list line] {line}")
-                self.write(line, trim_ws)
-            return  # list has already been processed
-
-        if isinstance(cmd, str) and cmd.find("\n") > -1:
-            for multi_line in cmd.split("\n"):
-                # self.debug_log(f"><> [multi_line] {multi_line}")
-                self.write(multi_line, trim_ws)
-            return  # lines have already been processed
-
-        if not self._parsing_note and cmd.find("bind -N") > -1:
-            #
-            #  Returns a list of lines. If input contained a -N and notes
-            #  are not supported by this tmux, the note is extracted and
-            #  the following is returned.
-            #  self.use_notes_as_comments = True
-            #   - note as a comment
-            #   - the remainder of the initial line
-            #  self.use_notes_as_comments = False
-            #   - the remainder of the initial line
-            #
-            self._parsing_note = True  # avoid recursion
-            # self.debug_log(f"><> [-N cmd] {cmd}")
-            # for line in self.filter_note(cmd.strip()):
-            for line in self.filter_note(cmd, trim_ws=trim_ws):
-                # self.debug_log(f"><> [note filtered line] {line}")
-                self.write(line, trim_ws)
-            # self.debug_log("><> [end of -N cmd]\n")
-            self._parsing_note = False
-            return  # lines have already been processed
-
-        if self.use_embedded_scripts and (btick_unescaped(str(cmd))):
-            raise SyntaxError(
-                "Un-escaped back-ticks can not be present in "
-                + "the generated config when\n"
-                + "embedded_scripts are used!"
-            )
-
-        # self.debug_log(f"><> [single line] {cmd}")
-        with open(self.conf_file, "a", encoding="utf-8") as f:
-            if trim_ws:
-                s_trimmed = cmd.strip()
-                self.debug_log(s_trimmed)
-                f.write(f"{s_trimmed}{eol}")  # use strip to get rid of indentions
-                #  f.write(f"{cmd}{eol}")
-            else:
-                f.write(f"{cmd}{eol}")
+        if origin is not None:
+            self._write_origin = origin
+        elif self._debug or self.use_source_map:
+            self._write_origin = origin_of(sys._getframe(1))  # pylint: disable=W0212
+        self.write_pipeline.run(cmd, trim_ws, eol)
+
+    def _write_sink(self, line: str, eol: str) -> None:
+        """Final step of the write pipeline"""
+        if self._debug:
+            self._debug.line(line, self._write_origin)
+        self.output.add(line, eol, self._write_origin)
 
     def filter_note(
         self,
@@ -470,30 +750,22 @@ class TmuxConfig:
             not line
             or line[0] == "#"
             or line.find("-N") < 0
-            or (self.vers_ok("3.1") and use_notes)
+            or (self.has("bind_notes") and use_notes)
         ):
             return [line]
-        parts = line.split("-N")
+        tokens = tokenize(line)
+        if tokens.note_idx < 0:
+            return [line]  # -N was part of something else, not a note flag
+        note_start, note_end = tokens.note_span
         if trim_ws:
-            pre = parts[0].strip()
+            pre = line[:note_start].strip()
         else:
-            pre = parts[0]
-        post = parts[1].strip()
-        if not post:
+            pre = line[:note_start]
+        if not tokens.note:
             # Probably an -N at end of line, so not related to a note
             return [pre]
-        p0 = post[0]
-        if p0 in {'"', "'"}:
-            end_note = post[1:].find(p0)
-            x = end_note + 1
-            note = post[1:x]
-            y = end_note + 2
-            post = post[y:]
-        else:  # single word note
-            note_end = post.find(" ")
-            note = post.split()[0]
-            post = post[note_end:]
-
+        note = tokens.note
+        post = line[note_end:].rstrip()
         while post.find("   ") == 0:
             post = post[1:]
         new_line = pre + post
@@ -513,10 +785,13 @@ class TmuxConfig:
         what tmux and config file is used, so that external commands
         know what to call if needed.
         """
-        self.remove_conf_file()
+        from .conf_header import LIB_VERSION_LABEL
+
+        #  Previous config remains in place until the new one is flushed
+        self.output.clear()
         self.write_enable(True)
 
-        print(f"Writing tmux {self.vers.get()} config to {self.conf_file}")
+        print(f"Writing tmux {self.vers.get()} config to {self.output_file}")
 
         w = self.write
         if self.use_embedded_scripts:
@@ -525,13 +800,18 @@ class TmuxConfig:
             # The above line tells embedded scripts where they start
             # further down in this file""")
 
+        #
+        #  When this config was written, and the fingerprint of what it
+        #  was generated from, is found in the sidecar file
+        #  {self.output.meta_file()}, keeping this file identical as long as
+        #  the generated config is the same.
+        #
         w(f"""#
         #  This config was created using
         #      https://github.com/jaclu/tmux-conf
         #
-        #      Creation time: {datetime.datetime.now().strftime("%F %T")}
-        #          tmux-conf: {self.lib_version}
-        #         Created on: {run_shell("hostname").strip()}""")
+        #          {LIB_VERSION_LABEL} {self.lib_version}
+        #         Created on: {self.probes["hostname"]}""")
         if self.is_tmate():
             w(f"#   For tmate version: {self.vers.get_reported()}")
         else:
@@ -566,7 +846,7 @@ class TmuxConfig:
         #  and to examine comments about what is generated and why.
         #  This .conf file will frequently be over-written!
         #
-        TMUX_SOURCE="{__main__.__file__}"
+        TMUX_SOURCE="{self.source_file}"
         """)
 
     def verify_replace(self) -> None:
@@ -574,13 +854,13 @@ class TmuxConfig:
         the param replace_config=True skips this check
         """
         default_conf_file = os.path.expanduser("~/.tmux.conf")
-        if self.conf_file == default_conf_file:
+        if self.output_file == default_conf_file:
             self.check_replace_default_config()
-        elif os.path.exists(self.conf_file):
+        elif os.path.exists(self.output_file):
             self.check_replace_custom_config()
 
     def check_replace_default_config(self) -> None:
-        if os.path.isfile(self.conf_file) or os.path.islink(self.conf_file):
+        if os.path.isfile(self.output_file) or os.path.islink(self.output_file):
             confirmation = input(
                 "Do you wish to replace the default config file (y/n)?"
             )
@@ -591,16 +871,11 @@ class TmuxConfig:
             sys.exit(1)
 
     def check_replace_custom_config(self) -> None:
-        confirmation = input(f"Do you wish to replace {self.conf_file} (y/n)?")
+        confirmation = input(f"Do you wish to replace {self.output_file} (y/n)?")
         if confirmation not in ("y", "Y"):
             print("Terminating...")
             sys.exit(1)
 
-    def remove_conf_file(self) -> None:
-        if os.path.exists(self.conf_file):
-            #  Ensure we start with an empty file
-            os.remove(self.conf_file)
-
     # ===============================================================
     #
     #   identify tmux bin
@@ -626,45 +901,94 @@ class TmuxConfig:
         """First check is to see if the tmux used to generate the
         previous config can be extracted.
         """
-        cmd = ""
-        if os.path.isfile(self.conf_file):
-            s = f'grep "TMUX_BIN=" {self.conf_file} | cut -d= -f 2 | sed s/\\"//g'
-            c = run_shell(s).strip()
-            if not c:
-                return ""
-            c2 = shutil.which(c)  # try to expand full path if not given
-            if not c2:
-                return ""
-            cmd = c2
-            print(f"found {cmd} in conf file")
+        from .conf_header import read_conf_header
+
+        header = read_conf_header(self.output_file)
+        if not header or not header.tmux_bin:
+            return ""
+        cmd = shutil.which(header.tmux_bin)  # try to expand full path if not given
+        if not cmd:
+            return ""
+        print(f"found {cmd} in conf file")
         return cmd
 
     def use_tmux_bin(self, tmux_bin: str = "tmux", vers_requested: str = "") -> bool:
         """Returns True if this was a valid tmux bin
         If this was the case self.tmux_bin & self.vers will have been set
         """
+        from .capabilities import Capabilities, probe_capabilities
+
         if not tmux_bin:
             tmux_bin = self.find_tmux_bin()  # now a full path
 
-        parts = run_shell(f"{tmux_bin} -V").split(" ")
+        if self.env_snapshot:
+            #  The binary might not even exist here
+            bin_id = None
+            cached = None
+            reported = self.env_snapshot.tmux_reported
+        else:
+            bin_id = self.tmux_bin_id(tmux_bin)
+            cached = self.binary_cache().get(bin_id) if bin_id else None
+            if cached:
+                reported = cached["reported"]
+            else:
+                reported = run_cmd([os.path.expanduser(tmux_bin), "-V"])
+        parts = reported.split(" ")
         if len(parts) != 2 or parts[0] not in ("tmux", "tmate"):
             self.debug_log(f"[error] {tmux_bin} Doesn't seem to be a tmux binary")
             raise TmuxConfNotTmuxCommand(f"{tmux_bin} Doesn't seem to be a tmux binary")
 
-        vers = VersionCheck(vers_detected=parts[1], vers_requested=vers_requested)
+        capabilities = None
+        if self.use_feature_probe and not self.env_snapshot:
+            capabilities = Capabilities.from_cache(cached) if cached else None
+            if not capabilities:
+                capabilities = probe_capabilities(tmux_bin)
+        vers = VersionCheck(
+            vers_detected=parts[1],
+            vers_requested=vers_requested,
+            capabilities=capabilities,
+        )
+        if bin_id and (not cached or (capabilities and "commands" not in cached)):
+            entry = {"tmux_bin": tmux_bin, "reported": reported}
+            if capabilities:
+                entry |= capabilities.to_cache()
+            self.binary_cache().put(bin_id, entry)
         # except TmuxConfInvalidTmuxVersion:
         #     print("{parts[[1]} Doesn't seem to be a valid tmux version")
         #     return False
         self.tmux_bin = tmux_bin
         # pylint: disable=W0201
+        self.tmux_reported = reported
         self.vers = vers
         return True
 
+    def binary_cache(self) -> "BinaryCache":
+        """The binary cache, opened when first used"""
+        if self.bin_cache is None:
+            from .bin_cache import BinaryCache
+
+            self.bin_cache = BinaryCache()
+        return self.bin_cache
+
+    def tmux_bin_id(self, tmux_bin: str) -> "BinaryId | None":
+        """Identifies the binary tmux_bin refers to, asdf shims are
+        resolved into the binary of the selected version.
+        None if it can't be identified, or use_bin_cache is False.
+        """
+        if not self.use_bin_cache:
+            return None
+        from .bin_cache import BinaryId, is_asdf_shim, resolve_asdf_shim
+
+        bin_path = shutil.which(os.path.expanduser(tmux_bin)) or ""
+        if bin_path and is_asdf_shim(bin_path):
+            bin_path = resolve_asdf_shim(bin_path)
+        if not bin_path:
+            return None
+        return BinaryId.of(bin_path)
+
     def full_path_cmd(self, cmd: str = "tmux", shim_expand_recursion=False) -> str:
         # returns full path of cmd if found
-        c = run_shell(f"command -v {cmd}")
-        if c and c.lower().find("not found") > -1:
-            raise TmuxConfNotTmuxCommand(f"Not found: {cmd}")
+        c = shutil.which(cmd) or ""
         if not shim_expand_recursion and c.find(".asdf/shims") > -1:
             cmd = self.full_path_cmd(c, True)
         else:
@@ -693,8 +1017,10 @@ class TmuxConfig:
             return
         if self.debug_log_file.exists():
             self.debug_log_file.unlink()
+        from .debug_log import DebugLog
+
+        self._debug = DebugLog(self.debug_log_file)
 
     def debug_log(self, msg: str) -> None:
-        if self.use_debug_log:
-            with open(self.debug_log_file, "a", encoding="utf-8") as f:
-                f.write(f"{msg}\n")
+        if self._debug:
+            self._debug.message(msg)
@@ -0,0 +1,102 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Splits tmux command lines into words
+
+Each line is scanned once, giving the words with quotes removed, their
+position in the line, and the -N note if one is present.
+Words follow the same rules as shlex.split(), but an unterminated quote
+is not an error, it just ends at end of line.
+
+Results are cached, so several passes inspecting the same line only
+tokenize it once.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+#  A word, made up of unquoted chars, quoted strings and escaped chars
+_WORD = re.compile(r"""(?:[^\s'"\\]+|'[^']*'?|"(?:[^"\\]|\\.)*"?|\\.?)+""", re.S)
+
+#  The parts of a word, used to remove quotes and escapes
+_WORD_PART = re.compile(r"""'([^']*)'?|"((?:[^"\\]|\\.)*)"?|\\(.?)|([^'"\\]+)""", re.S)
+
+#  Inside double quotes only \ and " can be escaped
+_DQ_ESCAPE = re.compile(r"""\\([\\"])""")
+
+#  A back-tick that is not preceded by a back-slash
+_BTICK_UNESCAPED = re.compile(r"(?<!\\)`")
+
+NOTE_FLAG = "-N"
+
+
+@dataclass(frozen=True)
+class LineTokens:
+    """Result of tokenizing a line"""
+
+    words: tuple[str, ...]  # quotes and escapes removed
+    spans: tuple[tuple[int, int], ...]  # start & end of each word in the line
+    note_idx: int  # index in words of the -N flag, -1 if not present
+
+    @property
+    def note(self) -> str:
+        """The -N note, "" if none was given"""
+        if self.note_idx < 0 or self.note_idx + 1 >= len(self.words):
+            return ""
+        return self.words[self.note_idx + 1]
+
+    @property
+    def note_span(self) -> tuple[int, int]:
+        """Start of the -N flag, and end of the note"""
+        start = self.spans[self.note_idx][0]
+        if self.note_idx + 1 < len(self.words):
+            return start, self.spans[self.note_idx + 1][1]
+        return start, self.spans[self.note_idx][1]
+
+
+def _unquote(raw: str) -> str:
+    if not any(c in raw for c in "'\"\\"):
+        return raw  # nothing to remove, the normal case
+    parts = []
+    for m in _WORD_PART.finditer(raw):
+        single_q, double_q, escaped, plain = m.groups()
+        if single_q is not None:
+            parts.append(single_q)
+        elif double_q is not None:
+            parts.append(_DQ_ESCAPE.sub(r"\1", double_q))
+        elif escaped is not None:
+            parts.append(escaped)
+        else:
+            parts.append(plain)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def tokenize(line: str) -> LineTokens:
+    """Split line into words, locating a -N note if present"""
+    words: list[str] = []
+    spans: list[tuple[int, int]] = []
+    note_idx = -1
+    for m in _WORD.finditer(line):
+        raw = m.group()
+        if note_idx < 0 and raw == NOTE_FLAG:
+            note_idx = len(words)
+        words.append(_unquote(raw))
+        spans.append(m.span())
+    return LineTokens(words=tuple(words), spans=tuple(spans), note_idx=note_idx)
+
+
+def btick_unescaped(line: str) -> bool:
+    """Returns True if line has a back-tick not escaped by a back-slash"""
+    if "`" not in line:
+        return False  # the normal case, no need for a regex
+    return _BTICK_UNESCAPED.search(line) is not None
@@ -16,25 +16,24 @@
 
 import argparse
 import os
-import subprocess  # nosec B404
+from pathlib import Path
 
+from . import tokenizer
 from .constants import __version__
+from .processes import run_cmd
 
 
 def btick_unescaped(line: str) -> bool:
     """Ensure any back-ticks on the line are escaped,
     otherwise running embedded scripts will fail.
     """
-    pos = line.find("`")
-    if not line or pos < 0:
-        return False  # None present
-    if line[pos - 1] != "\\":
-        return True  # Was nor escaped
-    #
-    # recurse to check rest of line
-    #
-    resume_pos = pos + 1
-    return btick_unescaped(line[resume_pos:])
+    return tokenizer.btick_unescaped(line)
+
+
+def cache_dir() -> Path:
+    """Where tmux-conf keeps cached data, honours XDG_CACHE_HOME"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(base) / "tmux_conf"
 
 
 def expanduser_plus(path: str) -> str:
@@ -79,6 +78,70 @@ def parse_cmdline(args: list[str]) -> argparse.Namespace:
         help="Do not ask for confirmation before replacing a config file",
     )
 
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Generate config even if no inputs have changed since it was created",
+    )
+
+    parser.add_argument(
+        "--timings",
+        action="store_const",
+        const="table",
+        default="",
+        help="Display time spent in each phase of generating the config",
+    )
+
+    parser.add_argument(
+        "--timings-json",
+        action="store_const",
+        const="json",
+        dest="timings",
+        help="As --timings, but printed as JSON",
+    )
+
+    parser.add_argument(
+        "--profile-imports",
+        action="store_const",
+        const="table",
+        default="",
+        help="Display import time of the modules used by this profile, "
+        + "then terminate without generating",
+    )
+
+    parser.add_argument(
+        "--profile-imports-json",
+        action="store_const",
+        const="json",
+        dest="profile_imports",
+        help="As --profile-imports, but printed as JSON",
+    )
+
+    parser.add_argument(
+        "--env-dump",
+        default="",
+        metavar="FILE",
+        help="Save a snapshot of the environment the config depends on, "
+        + "then terminate without generating",
+    )
+
+    parser.add_argument(
+        "--env-load",
+        default="",
+        metavar="FILE",
+        help="Generate from an environment snapshot, instead of the live environment",
+    )
+
+    parser.add_argument(
+        "--output",
+        default="",
+        metavar="FILE",
+        help="Write the config to FILE, conf_file is then only where it will be "
+        + "used. With --env-load this generates a config for the host the "
+        + "snapshot was taken on, using its HOME and conf_file",
+    )
+
     parser.add_argument(
         "-p",
         "--plugins_display",
@@ -108,15 +171,12 @@ def parse_cmdline(args: list[str]) -> argparse.Namespace:
 
 
 def run_shell(cmd: str) -> str:
-    """Run a command in a shell"""
-    # pylint: disable=subprocess-run-check
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        shell=True,  # nosec: B602
-    )
-    return result.stdout.strip()
+    """Run a command in a shell
+
+    Kept for profiles using it, prefer processes.run_cmd() with an argv
+    list, that avoids the extra shell process.
+    """
+    return run_cmd(["/bin/sh", "-c", cmd])
 
 
 def tilde_home_dir(path: str) -> str:
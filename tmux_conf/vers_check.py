@@ -11,15 +11,92 @@
 #
 #  See the README.md in the repository for more info
 #
-"""compares tmux versions"""
+"""compares tmux versions
+
+Version checks are done a lot while generating a config, so parsed
+version literals are cached, and each VersionCheck keeps a table of the
+results of the checks done so far, as well as of all named features.
+
+If the capabilities of the binary are given, named features are answered
+by them. For dev builds, the version is raised to the newest one whose
+probed features are all present.
+"""
 
 import re
+from functools import cache
+from typing import TYPE_CHECKING
+
+from .features import FEATURE_PROBES, FEATURES
+
+if TYPE_CHECKING:
+    from .capabilities import Capabilities
+
+
+@cache
+def parse_vers(vers: int | float | str) -> tuple[int, int, str]:
+    """vers as a comparable tuple: major, minor, suffix"""
+    a, b = normalize_vers(vers).split(".")
+    try:
+        vers_maj = int(a)
+    except ValueError as exc:
+        print(f"ERROR: vers_ok({vers}) - maj part not int!")
+        raise ValueError from exc
+    vers_min, suffix = get_sub_vers(b)
+    return vers_maj, vers_min, suffix
+
+
+def get_sub_vers(v2: str) -> tuple[int, str]:
+    """get sub version"""
+    int_part = ""
+    for c in v2:
+        if not "0" <= c <= "9":
+            break
+        int_part += c
+    if not int_part:
+        raise ValueError("sub_vers had no int part")
+    i = int(int_part)
+    s = v2.split(int_part)[1]
+    return i, s
+
+
+def normalize_vers(vers: int | float | str) -> str:
+    """Normalizes vers into a string"""
+
+    if isinstance(vers, str) and vers.find(".") < 0:
+        try:
+            vers = int(vers)
+        except ValueError as err:
+            print(f"ERROR: vers_check normalize_vers({vers}) bad param")
+            raise ValueError from err
+    if isinstance(vers, int):
+        vers = f"{vers}.0"
+    elif isinstance(vers, float):
+        vers = f"{vers}"
+    #  correct , -> .
+    vers = vers.replace(",", ".")
+    # param fixes
+    vers.replace("next-", "")  # skip prefix
+    vers = vers.split("-rc")[0]  # cut off before suffix
+    #
+    #  Only keep first two items
+    #
+    parts = vers.split(".")
+    # if len(parts) > 2:
+    #     raise ValueError(f"ERROR: normalize_vers({vers}) > 2 parts")
+    if len(parts) < 2:
+        raise ValueError(f"ERROR: normalize_vers({vers}) < 2 parts")
+    return ".".join(parts[:2])
 
 
 class VersionCheck:
     """compares tmux versions"""
 
-    def __init__(self, vers_detected: str, vers_requested: str = ""):
+    def __init__(
+        self,
+        vers_detected: str,
+        vers_requested: str = "",
+        capabilities: "Capabilities | None" = None,
+    ):
         # Remove subversion prefix/suffix
 
         self._vers_detected = vers_detected
@@ -37,6 +114,13 @@ class VersionCheck:
                 f"Relabeling detected tmux version: {vers_detected} -> {vers_filtered}"
             )
         self._vers_actual = self.normalize_vers(vers_filtered)
+        #  A requested version overrides what the binary supports
+        self.capabilities = None if vers_requested else capabilities
+        if self.capabilities and vers_detected != vers_filtered:
+            effective = self.probed_vers(self._vers_actual, self.capabilities)
+            if effective != self._vers_actual:
+                print(f"Features of tmux {vers_detected} match version: {effective}")
+                self._vers_actual = effective
         if vers_requested:
             self._vers = self.normalize_vers(vers_requested)
         else:
@@ -59,6 +143,33 @@ class VersionCheck:
             print(f"Error: v_maj was not int: {self._vers}")
             raise ValueError from exc
         self.v_min, self.v_suffix = self.get_sub_vers(v_min)
+        self._parsed = (self.v_maj, self.v_min, self.v_suffix)
+
+        #  Results of is_ok() so far, by the param given
+        self._is_ok_results: dict[int | float | str, bool] = {}
+        self.features = {
+            name: parse_vers(vers) <= self._parsed for name, vers in FEATURES.items()
+        }
+        if self.capabilities:
+            for name, probe in FEATURE_PROBES.items():
+                self.features[name] = self.capabilities.has(probe)
+
+    @staticmethod
+    def probed_vers(vers: str, capabilities: "Capabilities") -> str:
+        """Newest version above vers, with all probed features up to it present"""
+        probed = {name: parse_vers(FEATURES[name]) for name in FEATURE_PROBES}
+        effective = vers
+        for f_vers in sorted(set(probed.values())):
+            if f_vers <= parse_vers(effective):
+                continue
+            if not all(
+                capabilities.has(FEATURE_PROBES[name])
+                for name, v in probed.items()
+                if v <= f_vers
+            ):
+                break
+            effective = f"{f_vers[0]}.{f_vers[1]}{f_vers[2]}"
+        return effective
 
     def get(self) -> str:
         """The version used for generating the config"""
@@ -81,68 +192,23 @@ class VersionCheck:
         param is needed. Internally version refs are always treated as
         strings.
         """
-        a, b = self.normalize_vers(vers).split(".")
-
         try:
-            vers_maj = int(a)
-        except ValueError as exc:
-            print(f"ERROR: vers_ok({vers}) - maj part not int!")
-            raise ValueError from exc
-
-        vers_min, suffix = self.get_sub_vers(b)
+            return self._is_ok_results[vers]
+        except KeyError:
+            result = self._is_ok_results[vers] = parse_vers(vers) <= self._parsed
+            return result
 
-        if vers_maj > self.v_maj:
-            return False
-        if vers_maj < self.v_maj:
-            return True
-
-        r = True
-        if vers_min > self.v_min:
-            r = False
-        elif vers_min == self.v_min and suffix > self.v_suffix:
-            r = False
-        return r
+    def has(self, feature: str) -> bool:
+        """Checks if named feature, see features.py, is available"""
+        try:
+            return self.features[feature]
+        except KeyError as exc:
+            raise ValueError(f"Unknown tmux feature: {feature}") from exc
 
     def get_sub_vers(self, v2: str) -> tuple[int, str]:
         """get sub version"""
-
-        int_part = ""
-        for c in v2:
-            try:
-                int(c)
-            except ValueError:
-                break
-            int_part += c
-        if not int_part:
-            raise ValueError("sub_vers had no int part")
-        i = int(int_part)
-        s = v2.split(int_part)[1]
-        return i, s
+        return get_sub_vers(v2)
 
     def normalize_vers(self, vers: int | float | str) -> str:
         """Normalizes vers into a string"""
-
-        if isinstance(vers, str) and vers.find(".") < 0:
-            try:
-                vers = int(vers)
-            except ValueError as err:
-                print(f"ERROR: vers_check normalize_vers({vers}) bad param")
-                raise ValueError from err
-        if isinstance(vers, int):
-            vers = f"{vers}.0"
-        elif isinstance(vers, float):
-            vers = f"{vers}"
-        #  correct , -> .
-        vers = vers.replace(",", ".")
-        # param fixes
-        vers.replace("next-", "")  # skip prefix
-        vers = vers.split("-rc")[0]  # cut off before suffix
-        #
-        #  Only keep first two items
-        #
-        parts = vers.split(".")
-        # if len(parts) > 2:
-        #     raise ValueError(f"ERROR: normalize_vers({vers}) > 2 parts")
-        if len(parts) < 2:
-            raise ValueError(f"ERROR: normalize_vers({vers}) < 2 parts")
-        return ".".join(parts[:2])
+        return normalize_vers(vers)
@@ -0,0 +1,244 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Generating a profile for all known tmux versions, once per equivalence class
+
+    python3 -m tmux_conf.vers_matrix [--verify] [--validate] PROFILE
+
+A config only depends on the tmux version through vers_ok() and has(),
+so versions giving the same result for every version checked by the
+profile give the same config. The versions checked are recorded when
+generating, the known versions are split into classes by them, and the
+newest version of each class is generated. Checks are only done in the
+code paths taken, so this is repeated for the new classes, until no new
+versions are checked.
+
+--verify also generates all the other versions, and checks that they are
+identical to their class. --validate sources each generated config with
+the asdf tmux of that version, when installed. This is only done for the
+representatives, as the versions in a class give identical configs.
+
+Version strings, like in the header or set-titles-string, are ignored
+when comparing.
+"""
+
+import contextlib
+import io
+import os
+import runpy
+import sys
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from .features import FEATURES
+from .processes import CmdResult, run_cmd, run_cmd_result
+from .reset_hooks import reset_all
+from .vers_check import VersionCheck, parse_vers
+
+#  tmux releases, oldest first
+KNOWN_VERSIONS = (
+    "0.8", "0.9", "1.0", "1.1", "1.4", "1.5", "1.6", "1.7", "1.8", "1.9",
+    "1.9a", "2.0", "2.1", "2.2", "2.3", "2.4", "2.5", "2.6", "2.7", "2.8",
+    "2.9", "2.9a", "3.0", "3.0a", "3.1", "3.1a", "3.1b", "3.1c", "3.2", "3.2a",
+    "3.3", "3.3a", "3.4", "3.5", "3.5a", "3.6", "3.7",
+)  # fmt: skip
+
+ASDF_TMUX = "~/.asdf/installs/tmux/{vers}/bin/tmux"
+
+#  Header lines that differ between versions
+_VERSION_LINES = ("For tmux version:",)
+
+
+@dataclass(frozen=True)
+class VersionClass:
+    """Versions giving identical configs, the config of representative
+    is what was generated.
+    """
+
+    versions: tuple[str, ...]
+    representative: str
+    config: str
+
+
+@contextlib.contextmanager
+def recorded_checks() -> Iterator[set[tuple[int, int, str]]]:
+    """Versions checked by vers_ok() and has() while in this context"""
+    checked: set[tuple[int, int, str]] = set()
+    orig_is_ok = VersionCheck.is_ok
+    orig_has = VersionCheck.has
+
+    def is_ok(self: VersionCheck, vers: int | float | str) -> bool:
+        checked.add(parse_vers(vers))
+        return orig_is_ok(self, vers)
+
+    def has(self: VersionCheck, feature: str) -> bool:
+        checked.add(parse_vers(FEATURES[feature]))
+        return orig_has(self, feature)
+
+    VersionCheck.is_ok = is_ok  # type: ignore[method-assign]
+    VersionCheck.has = has  # type: ignore[method-assign]
+    try:
+        yield checked
+    finally:
+        VersionCheck.is_ok = orig_is_ok  # type: ignore[method-assign]
+        VersionCheck.has = orig_has  # type: ignore[method-assign]
+
+
+def generate(profile: str, vers: str, conf_file: str) -> str:
+    """Config from profile for tmux vers, with version strings removed"""
+    saved_argv = sys.argv
+    sys.argv = [profile, "-r", "-f", "-V", vers, conf_file]
+    reset_all()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(profile, run_name="__main__")
+    except SystemExit as exc:
+        if exc.code:
+            raise RuntimeError(f"{profile} -V {vers} failed: {exc.code}") from exc
+    finally:
+        sys.argv = saved_argv
+    with open(conf_file, encoding="utf-8") as f:
+        lines = f.read().replace(f"tmux {vers}", "tmux VERS").split("\n")
+    return "\n".join(s for s in lines if not any(v in s for v in _VERSION_LINES))
+
+
+def partition(
+    checked: set[tuple[int, int, str]], versions: tuple[str, ...] = KNOWN_VERSIONS
+) -> list[tuple[str, ...]]:
+    """Versions grouped by the result of each check"""
+    thresholds = sorted(checked)
+    classes: dict[tuple[bool, ...], list[str]] = {}
+    for vers in versions:
+        key = tuple(t <= parse_vers(vers) for t in thresholds)
+        classes.setdefault(key, []).append(vers)
+    return [tuple(c) for c in classes.values()]
+
+
+def asdf_tmux(vers: str) -> str:
+    """asdf tmux bin for vers, "" if not installed"""
+    tmux_bin = os.path.expanduser(ASDF_TMUX.format(vers=vers))
+    return tmux_bin if os.access(tmux_bin, os.X_OK) else ""
+
+
+def pick_representative(versions: tuple[str, ...]) -> str:
+    """Newest version, preferring installed ones, so it can be validated"""
+    installed = [v for v in versions if asdf_tmux(v)]
+    return (installed or list(versions))[-1]
+
+
+def version_classes(profile: str, conf_file: str) -> list[VersionClass]:
+    """Generate profile once per class of versions giving identical configs"""
+    configs: dict[str, str] = {}
+    checked: set[tuple[int, int, str]] = set()
+    classes: list[tuple[str, ...]] = [KNOWN_VERSIONS]
+    while True:
+        for versions in classes:
+            rep = pick_representative(versions)
+            if rep not in configs:
+                with recorded_checks() as run_checked:
+                    configs[rep] = generate(profile, rep, conf_file)
+                checked |= run_checked
+        new_classes = partition(checked)
+        if new_classes == classes:
+            break
+        classes = new_classes
+    return [
+        VersionClass(c, pick_representative(c), configs[pick_representative(c)])
+        for c in classes
+    ]
+
+
+def verify(profile: str, conf_file: str, vc: VersionClass) -> list[str]:
+    """Versions in the class giving another config than its representative"""
+    return [
+        vers
+        for vers in vc.versions
+        if vers != vc.representative and generate(profile, vers, conf_file) != vc.config
+    ]
+
+
+def validate(profile: str, vers: str, conf_file: str) -> str:
+    """Error from sourcing the config in the asdf tmux for vers,
+    "" if it was ok, "not installed" if there is no such tmux.
+    """
+    tmux_bin = asdf_tmux(vers)
+    if not tmux_bin:
+        return "not installed"
+    #  Generated for this bin, it might be referred to in the config
+    saved_argv = sys.argv
+    sys.argv = [profile, "-r", "-f", "-t", tmux_bin, conf_file]
+    reset_all()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(profile, run_name="__main__")
+    except SystemExit as exc:
+        if exc.code:
+            return f"failed to generate: {exc.code}"
+    finally:
+        sys.argv = saved_argv
+    socket = f"vers_matrix-{os.getpid()}"
+    cmd = [tmux_bin, "-L", socket, "-f", "/dev/null", "new-session", "-d"]
+    try:
+        failure = _failure(run_cmd_result(cmd))
+        if failure:
+            return f"failed to start: {failure}"
+        return _failure(
+            run_cmd_result([tmux_bin, "-L", socket, "source-file", conf_file])
+        )
+    finally:
+        run_cmd([tmux_bin, "-L", socket, "kill-server"])
+
+
+def _failure(result: CmdResult) -> str:
+    """What went wrong running a tmux command, "" if nothing did"""
+    if result.timed_out:
+        return "timeout"
+    if result.returncode or result.stderr.strip():
+        return result.stderr.strip() or f"exit code {result.returncode}"
+    return ""
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    do_verify = "--verify" in args
+    do_validate = "--validate" in args
+    args = [a for a in args if a not in ("--verify", "--validate")]
+    if len(args) != 1:
+        print("Usage: python3 -m tmux_conf.vers_matrix [--verify] [--validate] PROFILE")
+        return 1
+    profile = os.path.abspath(args[0])
+    sys.path.insert(0, os.path.dirname(profile))  # as for a script
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conf_file = os.path.join(tmp_dir, "tmux.conf")
+        classes = version_classes(profile, conf_file)
+        print(
+            f"{len(KNOWN_VERSIONS)} known versions, {len(classes)} classes "
+            + "giving different configs"
+        )
+        for vc in classes:
+            line = f"  {vc.representative:<5} {' '.join(vc.versions)}"
+            if do_verify:
+                differing = verify(profile, conf_file, vc)
+                failed = failed or bool(differing)
+                line += f"  DIFFERS: {' '.join(differing)}" if differing else ""
+            if do_validate:
+                error = validate(profile, vc.representative, conf_file)
+                failed = failed or error not in ("", "not installed")
+                line += f"  - {error or 'valid'}"
+            print(line)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
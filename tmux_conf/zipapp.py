@@ -0,0 +1,117 @@
+#
+#  Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+#  License: MIT
+#
+#  Part of https://github.com/jaclu/tmux-conf
+#
+#  See constants.py for version info
+#
+#  See the README.md in the repository for more info
+#
+
+"""Running profiles from a zipapp bundle
+
+    python3 my_tmux_conf.pyz PROFILE [profile options]
+
+PROFILE is either a file, or a script in the bundle, such as t2.py or
+sb/sb_local.py. @host selects the profile for this host, the same way
+myt does. See tools/build_zipapp.py for how the bundle is built.
+
+Scripts in the bundle can't be run by path, script_command() gives
+the command running a script, regardless of if it is bundled or not.
+"""
+
+import importlib.util
+import os
+import runpy
+import sys
+
+HOST_PROFILE = "@host"
+DEFAULT_PROFILE = "default_plugins.py"
+
+#  Path of the bundle, when running from one
+_bundle = ""
+
+
+def bundle_file() -> str:
+    """The bundle being run, "" if not running from a bundle"""
+    return _bundle
+
+
+def script_name(f_name: str) -> str:
+    """Name of a bundled script, relative to the bundle"""
+    name = os.path.relpath(f_name, _bundle)
+    return name[:-1] if name.endswith(".pyc") else name
+
+
+def script_command(f_name: str) -> list[str]:
+    """Command running script f_name"""
+    if _bundle and f_name.startswith(_bundle + os.sep):
+        return [sys.executable, _bundle, script_name(f_name)]
+    return [sys.executable, f_name]
+
+
+def profile_source(f_name: str) -> str:
+    """How to refer to profile f_name in the config, a bundled profile is
+    given as: bundle profile, the bundle is executable.
+    """
+    if _bundle and f_name.startswith(_bundle + os.sep):
+        return f"{_bundle} {script_name(f_name)}"
+    return f_name
+
+
+def main_profile_source() -> str:
+    """profile_source() of the profile being run as __main__"""
+    f_name = getattr(sys.modules["__main__"], "__file__", None)
+    if f_name is None:
+        raise RuntimeError("__main__ has no source file, not run as a profile")
+    return profile_source(f_name)
+
+
+def module_name(name: str) -> str:
+    return name.removesuffix(".py").replace("/", ".")
+
+
+def is_bundled(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(module_name(name)) is not None
+    except ImportError:
+        return False  # parent folder not bundled
+
+
+def host_profile() -> str:
+    """The profile myt would select for this host"""
+    # pylint: disable-next=import-outside-toplevel
+    import socket  # only needed here, when run from a bundle
+
+    host = socket.gethostname().split(".")[0].lower()
+    for name in (
+        "hostnames/_def_profile.py",
+        f"hostnames/{host}.py",
+        f"sample_hosts/{host}.py",
+    ):
+        if is_bundled(name):
+            return name
+    return DEFAULT_PROFILE
+
+
+def main() -> int:
+    global _bundle  # pylint: disable=global-statement
+
+    if len(sys.argv) < 2:
+        print(f"Usage: {os.path.basename(sys.argv[0])} PROFILE [profile options]")
+        return 1
+    _bundle = os.path.abspath(sys.argv[0])
+    name = sys.argv[1]
+    if name == HOST_PROFILE:
+        name = host_profile()
+    if os.path.isfile(name):
+        sys.argv = [name] + sys.argv[2:]
+        runpy.run_path(name, run_name="__main__")
+    elif is_bundled(name):
+        sys.argv = [os.path.join(_bundle, name)] + sys.argv[2:]
+        runpy.run_module(module_name(name), run_name="__main__", alter_sys=True)
+    else:
+        print(f"ERROR: No such profile: {name}")
+        return 1
+    return 0
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+License: MIT
+
+Part of https://github.com/jaclu/my_tmux_conf
+
+Builds a single file zipapp, holding tmux_conf and all profiles
+
+    tools/build_zipapp.py [-o dist/my_tmux_conf.pyz]
+
+Each module is included both as source and as optimized bytecode, the
+bytecode is used if the Python running the bundle is the same version as
+the one building it, otherwise the source is used.
+The bundle is reproducible, unchanged sources give an identical bundle.
+
+Run profiles with:  my_tmux_conf.pyz PROFILE [profile options]
+See tmux_conf/zipapp.py
+"""
+
+import argparse
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_OUTPUT = ROOT_DIR / "dist" / "my_tmux_conf.pyz"
+
+INTERPRETER = "/usr/bin/env python3"
+
+#  Relative to ROOT_DIR, folders are included recursively
+ITEMS = (
+    "tmux_conf",
+    "base.py",
+    "default_plugins.py",
+    "tablet_kbd.py",
+    "mtc_utils.py",
+    "ish_host.py",
+    "t2.py",
+    "tmate.py",
+    "sb",
+    "sample_hosts",
+    "hostnames",  # host profiles, not in the repo
+)
+
+MAIN_PY = """import sys
+
+from tmux_conf.zipapp import main
+
+sys.exit(main())
+"""
+
+#  Fixed timestamp, for reproducible bundles
+DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def source_files() -> list[Path]:
+    files: list[Path] = []
+    for item in ITEMS:
+        path = ROOT_DIR / item
+        if path.is_dir():
+            files.extend(p for p in path.rglob("*.py") if "__pycache__" not in p.parts)
+        elif path.is_file():
+            files.append(path)
+    return sorted(files)
+
+
+def missing_init_files(files: list[Path]) -> list[str]:
+    """zipimport does not handle namespace packages, folders like sb/
+    need an __init__.py in the bundle
+    """
+    folders = {p.parent for p in files if p.parent != ROOT_DIR}
+    return sorted(
+        (d / "__init__.py").relative_to(ROOT_DIR).as_posix()
+        for d in folders
+        if not (d / "__init__.py").exists()
+    )
+
+
+def compiled(source: Path, name: str, tmp_dir: str) -> bytes:
+    """Optimized bytecode, not checked against the source when loaded"""
+    cfile = os.path.join(tmp_dir, "module.pyc")
+    py_compile.compile(
+        str(source),
+        cfile=cfile,
+        dfile=name,
+        doraise=True,
+        optimize=2,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    with open(cfile, "rb") as f:
+        return f.read()
+
+
+def add(zf: zipfile.ZipFile, name: str, data: bytes) -> None:
+    info = zipfile.ZipInfo(name, date_time=DATE_TIME)
+    info.compress_type = zipfile.ZIP_STORED
+    info.external_attr = 0o644 << 16
+    zf.writestr(info, data)
+
+
+def build(output: Path) -> int:
+    """Returns number of modules bundled"""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    files = source_files()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        main_py = Path(tmp_dir) / "__main__.py"
+        main_py.write_text(MAIN_PY, encoding="utf-8")
+        empty_py = Path(tmp_dir) / "empty.py"
+        empty_py.write_text("", encoding="utf-8")
+        items = [(main_py, "__main__.py")]
+        items += [(p, p.relative_to(ROOT_DIR).as_posix()) for p in files]
+        items += [(empty_py, name) for name in missing_init_files(files)]
+        with open(output, "wb") as f:
+            f.write(f"#!{INTERPRETER}\n".encode())
+            with zipfile.ZipFile(f, "w") as zf:
+                for source, name in sorted(items, key=lambda item: item[1]):
+                    add(zf, name, source.read_bytes())
+                    add(zf, f"{name}c", compiled(source, name, tmp_dir))
+    output.chmod(0o755)
+    return len(files)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build a zipapp of tmux_conf & profiles"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"where to save the bundle (default {DEFAULT_OUTPUT.relative_to(ROOT_DIR)})",
+    )
+    args = parser.parse_args()
+    count = build(args.output)
+    size = args.output.stat().st_size
+    print(f"Bundled {count} modules into {args.output} - {size // 1024} kB")
+    print(f"Bytecode is for Python {sys.version_info.major}.{sys.version_info.minor}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
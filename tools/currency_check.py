@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+License: MIT
+
+Part of https://github.com/jaclu/my_tmux_conf
+
+Verifies the currency lookup, using a local HTTP stand-in for the
+currency service, and a temporary HOME so that no real cache is touched.
+
+- A cold cache returns "" right away, and starts a background prefetch
+- While that prefetch is running, no other prefetch is started
+- The prefetch fills the cache from the stand-in
+- mtc_utils.py --prefetch-currency (used by deploy) does the same
+
+Exit code is 1 if any check fails.
+"""
+
+import http.server
+import json
+import os
+import subprocess  # nosec B404 - runs the current python only
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CURRENCY = "XTS"  # ISO 4217 code reserved for testing
+
+CHECK_NON_BLOCKING = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+import mtc_utils
+from tmux_conf.processes import PROCESSES
+t_start = time.perf_counter()
+currency = mtc_utils.get_currency()
+print(repr(currency), round(time.perf_counter() - t_start, 3), len(PROCESSES.calls))
+"""
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    """Responds like ipwhois.app, after a delay"""
+
+    delay = 1.0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        time.sleep(self.delay)
+        body = json.dumps({"currency_code": CURRENCY}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def wait_for_lock(f_name: Path, timeout: float) -> bool:
+    t_end = time.time() + timeout
+    while time.time() < t_end:
+        if f_name.exists():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def wait_for(f_name: Path, timeout: float) -> str:
+    t_end = time.time() + timeout
+    while time.time() < t_end:
+        if f_name.exists():
+            return f_name.read_text().strip()
+        time.sleep(0.1)
+    return ""
+
+
+def main() -> int:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    errors = []
+    with tempfile.TemporaryDirectory() as home:
+        env = os.environ | {
+            "HOME": home,
+            "TMUX_CONF_CURRENCY_URL": f"http://127.0.0.1:{server.server_port}/json/",
+        }
+        cache_file = Path(home) / ".cache" / "tmux_conf_currency"
+
+        check_cmd = [sys.executable, "-c", CHECK_NON_BLOCKING, str(ROOT_DIR)]
+        out = subprocess.run(  # nosec B603
+            check_cmd, env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        print(f"cold cache returned: {out[0]} in {out[1]}s")
+        if out[0] != "''" or float(out[1]) >= StandIn.delay:
+            errors.append("get_currency() blocked on a cold cache")
+        if wait_for_lock(cache_file.with_name(cache_file.name + ".lock"), timeout=5):
+            out = subprocess.run(  # nosec B603
+                check_cmd, env=env, capture_output=True, text=True, check=True
+            ).stdout.split()
+            print(f"during prefetch, processes started: {out[2]}")
+            if out[2] != "0":
+                errors.append("get_currency() started a second prefetch")
+        else:
+            errors.append("background prefetch did not start")
+        found = wait_for(cache_file, timeout=10)
+        print(f"background prefetch cached: {found!r}")
+        if found != CURRENCY:
+            errors.append("background prefetch did not fill the cache")
+
+        cache_file.unlink()
+        printed = subprocess.run(  # nosec B603
+            [sys.executable, str(ROOT_DIR / "mtc_utils.py"), "--prefetch-currency"],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        print(f"--prefetch-currency printed: {printed!r}")
+        if printed != CURRENCY or cache_file.read_text().strip() != CURRENCY:
+            errors.append("--prefetch-currency did not fill the cache")
+    server.shutdown()
+
+    for error in errors:
+        print(f"ERROR: {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
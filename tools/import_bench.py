@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+License: MIT
+
+Part of https://github.com/jaclu/my_tmux_conf
+
+Import-time regression check
+
+Each module is imported in a fresh interpreter a number of times, using
+python -X importtime, the median of its cumulative import time is
+compared to its budget.
+
+Importing mtc_utils is also checked to be free of side effects: no
+process may be started and none of its lazy values may be computed.
+
+Exit code is 1 if any check fails.
+"""
+
+import argparse
+import statistics
+import subprocess  # nosec B404 - runs the current python only
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+#  Budgets in ms, the medians measured before the import work started,
+#  mtc_utils 38, base 75 and default_plugins 85, plus about 10% for noise,
+#  so anything slower than that is a regression. Lower them as imports
+#  get quicker
+DEFAULT_BUDGETS = {
+    "mtc_utils": 42.0,
+    "base": 83.0,
+    "default_plugins": 94.0,
+}
+
+SIDE_EFFECT_CHECK = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import mtc_utils
+from tmux_conf.processes import PROCESSES
+computed = sorted(set(mtc_utils._LAZY) & set(vars(mtc_utils)))
+print(len(PROCESSES.calls), ",".join(computed))
+"""
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of module in a fresh interpreter"""
+    result = subprocess.run(  # nosec B603
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys; sys.path.insert(0, {str(ROOT_DIR)!r}); import {module}",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        #  import time: self [us] | cumulative | imported package
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def check_side_effects() -> list[str]:
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-c", SIDE_EFFECT_CHECK, str(ROOT_DIR)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    processes, _, computed = result.stdout.strip().partition(" ")
+    errors = []
+    if processes != "0":
+        errors.append(f"importing mtc_utils started {processes} process(es)")
+    if computed:
+        errors.append(f"importing mtc_utils computed: {computed}")
+    return errors
+
+
+def parse_budget(item: str) -> tuple[str, float]:
+    module, ms = item.split("=")
+    return module, float(ms)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time regression check")
+    parser.add_argument(
+        "-n", "--runs", type=int, default=5, help="imports per module (default 5)"
+    )
+    parser.add_argument(
+        "-b",
+        "--budget",
+        action="append",
+        type=parse_budget,
+        default=[],
+        metavar="MODULE=MS",
+        help="set budget for a module, can be given multiple times",
+    )
+    args = parser.parse_args()
+    budgets = DEFAULT_BUDGETS | dict(args.budget)
+
+    failed = False
+    print(f"{'module':<20} {'median ms':>10} {'budget':>8}")
+    for module, budget in budgets.items():
+        median = statistics.median(import_time_ms(module) for _ in range(args.runs))
+        status = "" if median <= budget else "  OVER BUDGET"
+        failed = failed or bool(status)
+        print(f"{module:<20} {median:10.2f} {budget:8.1f}{status}")
+
+    for error in check_side_effects():
+        failed = True
+        print(f"ERROR: {error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2025: Jacob.Lundqvist@gmail.com
+License: MIT
+
+Part of https://github.com/jaclu/my_tmux_conf
+
+Micro-benchmark of version checks
+
+A profile is run once, recording all version checks it does, both by
+version with is_ok() and by feature name with has(). Those checks are then
+repeated, as done in a fresh run, with the previous implementation parsing
+each version param on every check, a feature then being a check of the
+version it appeared in, and with the result tables in VersionCheck, and
+the time per run is compared.
+
+    tools/vers_check_bench.py [-n runs] [-V vers] [profile]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import runpy
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# pylint: disable=wrong-import-position
+from tmux_conf.features import FEATURES  # noqa: E402
+from tmux_conf.vers_check import VersionCheck, parse_vers  # noqa: E402
+
+#  A recorded check, the method used and its param
+Check = tuple[str, int | float | str]
+
+
+def legacy_is_ok(vc: VersionCheck, vers: int | float | str) -> bool:
+    """VersionCheck.is_ok() before the result tables"""
+    a, b = vc.normalize_vers(vers).split(".")
+    vers_maj = int(a)
+    int_part = ""
+    for c in b:
+        try:
+            int(c)
+        except ValueError:
+            break
+        int_part += c
+    vers_min, suffix = int(int_part), b.split(int_part)[1]
+    if vers_maj > vc.v_maj:
+        return False
+    if vers_maj < vc.v_maj:
+        return True
+    r = True
+    if vers_min > vc.v_min:
+        r = False
+    elif vers_min == vc.v_min and suffix > vc.v_suffix:
+        r = False
+    return r
+
+
+def record_checks(profile: str, vers: str) -> list[Check]:
+    """All version checks done when generating a config with profile"""
+    checks: list[Check] = []
+    orig_is_ok = VersionCheck.is_ok
+    orig_has = VersionCheck.has
+
+    def is_ok(self: VersionCheck, vers: int | float | str) -> bool:
+        checks.append(("is_ok", vers))
+        return orig_is_ok(self, vers)
+
+    def has(self: VersionCheck, feature: str) -> bool:
+        checks.append(("has", feature))
+        return orig_has(self, feature)
+
+    saved_argv = sys.argv
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conf_file = os.path.join(tmp_dir, "tmux.conf")
+        sys.argv = [profile, "-r", "-f", "-V", vers, conf_file]
+        VersionCheck.is_ok = is_ok  # type: ignore[method-assign]
+        VersionCheck.has = has  # type: ignore[method-assign]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                runpy.run_path(profile, run_name="__main__")
+        finally:
+            VersionCheck.is_ok = orig_is_ok  # type: ignore[method-assign]
+            VersionCheck.has = orig_has  # type: ignore[method-assign]
+            sys.argv = saved_argv
+    return checks
+
+
+def legacy_check(vc: VersionCheck, check: Check) -> bool:
+    """A check as done before, features were checked by version"""
+    method, param = check
+    if method == "has":
+        param = FEATURES[str(param)]
+    return legacy_is_ok(vc, param)
+
+
+def table_check(vc: VersionCheck, check: Check) -> bool:
+    method, param = check
+    if method == "has":
+        return vc.has(str(param))
+    return vc.is_ok(param)
+
+
+def time_legacy(checks: list[Check], vers: str, runs: int) -> float:
+    t_start = time.perf_counter()
+    for _ in range(runs):
+        vc = VersionCheck(vers)
+        for check in checks:
+            legacy_check(vc, check)
+    return (time.perf_counter() - t_start) / runs
+
+
+def time_table(checks: list[Check], vers: str, runs: int) -> float:
+    t_start = time.perf_counter()
+    for _ in range(runs):
+        parse_vers.cache_clear()  # as in a fresh run
+        vc = VersionCheck(vers)
+        for check in checks:
+            table_check(vc, check)
+    return (time.perf_counter() - t_start) / runs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark of version checks")
+    parser.add_argument(
+        "-n", "--runs", type=int, default=200, help="repeats to time (default 200)"
+    )
+    parser.add_argument(
+        "-V", "--vers", default="3.5a", help="tmux version to check (default 3.5a)"
+    )
+    parser.add_argument(
+        "profile",
+        nargs="?",
+        default=str(ROOT_DIR / "sb" / "sb_local.py"),
+        help="profile to record checks from (default sb/sb_local.py)",
+    )
+    args = parser.parse_args()
+
+    checks = record_checks(args.profile, args.vers)
+    vc = VersionCheck(args.vers)
+    if any(legacy_check(vc, c) != table_check(vc, c) for c in checks):
+        print("ERROR: result tables give different results")
+        return 1
+    legacy = time_legacy(checks, args.vers, args.runs)
+    table = time_table(checks, args.vers, args.runs)
+    features = sum(1 for method, _ in checks if method == "has")
+    print(
+        f"{len(checks)} version checks, {features} of them by feature, "
+        + f"{len(set(checks))} distinct params"
+    )
+    print(f"parsed on each check  {legacy * 1000:8.3f} ms per run")
+    print(f"result tables         {table * 1000:8.3f} ms per run")
+    print(f"saved                 {(legacy - table) * 1000:8.3f} ms per run")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())